@@ -25,6 +25,7 @@
 #     in the dictionary.
 
 
+from array import array
 from collections import defaultdict
 from itertools import count
 
@@ -117,8 +118,6 @@ def build_fallback(AC):
         # Pop the first item from the queue
         cur_state = q.pop(0)
 
-        cur_state_fallback = F[cur_state]
-
         
         # Update the "fallback states" and "outputs" for each of "cur_state"s children.
         # Then, add the children into the queue.
@@ -135,6 +134,10 @@ def build_fallback(AC):
             for c in C[cur_state]:
                 child_state = G[(cur_state, c)]
 
+                # Every child starts again from the fallback of cur_state
+                # (the loop below moves cur_state_fallback).
+                cur_state_fallback = F[cur_state]
+
                 # Go up the fallback chain starting from "cur_state_fallback"
                 # until you find a fallback state that has an outgoing edge
                 # for char 'c' or you reach the root (state = 0).
@@ -188,9 +191,129 @@ def search(test_string, AC):
 
 
 
+# Step3 (optional): Compile the automaton into a DFA.
+#
+# search() above follows fallback chains on a mismatch (a while loop) and does
+# several dict lookups per character (C[state], G[state, c], O[state]). Since
+# those are defaultdicts, every lookup of a missing key also inserts it.
+#
+# A DFA has a transition for every (state, symbol), fallbacks included:
+#
+#   next(s, c) = G[s, c]              if s has an edge for c
+#              = next(F[s], c)        otherwise (s != 0)
+#              = 0                    otherwise (s == 0)
+#
+# Computed in BFS order, F[s] is always done before s, so a row is a copy of
+# the row of F[s] with the edges of s written over it. Searching is then one
+# table lookup per character, no loops and no dicts.
+#
+# Layout:
+# - Symbols: bytes patterns (chars are ints 0 ... 255) use the byte itself as
+#   the symbol, 256 columns. Any other patterns get an "interned" alphabet:
+#   every char that appears in a pattern gets a column 1 ... k, and column 0
+#   stands for every other char (those always lead back to the root).
+# - table: one flat array('i') (int32) of num_states x width entries. States
+#   are stored premultiplied by the width (state s is s * width), so the next
+#   state is table[state + symbol], without a multiplication.
+# - States with outputs are numbered last, so "does this state have an
+#   output" is just state >= self.first_output.
+#
+# 'byte_symbols' picks the symbols: True for bytes, False for interned, None
+# (default) to go by the patterns. Without any patterns there is nothing to go
+# by, and the interned alphabet (a single column 0) works for any text.
+class DFA():
+    def __init__(self, AC, byte_symbols=None):
+        (G, F, O, C) = AC
+
+        # BFS order of the states (.get so that nothing gets inserted)
+        order = [0]
+        for state in order:
+            for c in sorted(C.get(state, ()), key=repr):
+                order.append(G[(state, c)])
+
+        chars = set(c for (state, c) in G)
+        if byte_symbols is None:
+            byte_symbols = bool(chars) and all(isinstance(c, int) and 0 <= c < 256 for c in chars)
+        elif byte_symbols and not all(isinstance(c, int) and 0 <= c < 256 for c in chars):
+            raise ValueError("byte_symbols needs bytes patterns")
+
+        if byte_symbols:
+            self.symbols = None # bytes: the symbol is the byte
+            width = 256
+        else:
+            self.symbols = {c: i + 1 for i, c in enumerate(sorted(chars, key=repr))}
+            width = len(self.symbols) + 1
+
+        # New state numbers: the root first, states with outputs last
+        plain  = [s for s in order if not O.get(s)]
+        output = [s for s in order if O.get(s)]
+        number = {s: i for i, s in enumerate(plain + output)}
+
+        self.width = width
+        self.first_output = len(plain) * width
+        self.outputs = [tuple(sorted(O[s], key=repr)) for s in output]
+
+        table = array('i', [0]) * (len(order) * width)
+        for state in order:
+            row = number[state] * width
+            if state != 0:
+                fallback_row = number[F.get(state, 0)] * width
+                table[row:row + width] = table[fallback_row:fallback_row + width]
+
+            for c in C.get(state, ()):
+                table[row + self.symbol(c)] = number[G[(state, c)]] * width
+
+        self.table = table
+
+
+    def symbol(self, c):
+        if self.symbols is None:
+            return c
+        return self.symbols.get(c, 0)
+
+
+    def __len__(self):
+        return len(self.table) // self.width
+
+
+    # Patterns that end at the given (premultiplied) state
+    def outputs_of(self, state):
+        return self.outputs[(state - self.first_output) // self.width]
+
+
+    # Yields (end index, patterns) for every position in 'text' where at
+    # least one pattern ends.
+    def finditer(self, text):
+        table = self.table
+        first_output = self.first_output
+        state = 0
+
+        if self.symbols is None:
+            for i, c in enumerate(text):
+                state = table[state + c]
+                if state >= first_output:
+                    yield i, self.outputs_of(state)
+        else:
+            symbols = self.symbols.get
+            for i, c in enumerate(text):
+                state = table[state + symbols(c, 0)]
+                if state >= first_output:
+                    yield i, self.outputs_of(state)
+
+
+
+# Same output as search(), with a compiled DFA
+def search_dfa(test_string, dfa):
+    for i, patterns in dfa.finditer(test_string):
+        print("Found " + str(set(patterns)) + " ending @ " + str(i))
+
+
 
+if __name__ == "__main__":
+    AC = aho_corasick()
+    build_trie(["bar", "ara", "bara", "barbara"], AC)
+    build_fallback(AC)
+    search("barbarian barbara said: barabum", AC)
 
-AC = aho_corasick()
-build_trie(["bar", "ara", "bara", "barbara"], AC)
-build_fallback(AC)
-search("barbarian barbara said: barabum", AC)
+    print()
+    search_dfa("barbarian barbara said: barabum", DFA(AC))
@@ -0,0 +1,62 @@
+# Throughput of search() (dict automaton) vs the compiled DFA, in MB/s.
+#
+# Usage: python aho_corasick_benchmark.py [text MB] [patterns]
+#
+# Random lowercase text (with spaces) and random words of 3 to 8 letters as
+# patterns. search() prints every match, so its output is sent to a buffer
+# (that costs something too, but it is what search() does). Checks that both
+# report the same number of match positions.
+
+
+import contextlib
+import io
+import random
+import sys
+import time
+
+from aho_corasick import DFA, aho_corasick, build_fallback, build_trie, search
+
+
+if __name__ == "__main__":
+    megabytes = float(sys.argv[1]) if len(sys.argv) > 1 else 2
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+
+    rnd = random.Random(1)
+    letters = "abcdefghijklmnopqrstuvwxyz    "
+    text = "".join(rnd.choice(letters) for _ in range(int(megabytes * 2**20)))
+    patterns = ["".join(rnd.choice(letters[:26]) for _ in range(rnd.randint(3, 8))) for _ in range(count)]
+
+    AC = aho_corasick()
+    build_trie(patterns, AC)
+    build_fallback(AC)
+
+    start = time.perf_counter()
+    dfa = DFA(AC)
+    print("%d patterns, %.1f MB of text (DFA: %d states x %d symbols, compiled in %.2f s)" %
+          (count, len(text) / 2**20, len(dfa), dfa.width, time.perf_counter() - start))
+
+    output = io.StringIO()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(output):
+        search(text, AC)
+    elapsed = time.perf_counter() - start
+    found = len(output.getvalue().splitlines())
+    print("search()       %8.2f MB/s  (%d match positions)" % (len(text) / 2**20 / elapsed, found))
+
+    start = time.perf_counter()
+    matches = sum(1 for match in dfa.finditer(text))
+    elapsed = time.perf_counter() - start
+    print("DFA str        %8.2f MB/s" % (len(text) / 2**20 / elapsed))
+    assert matches == found, "different number of matches"
+
+    AC = aho_corasick()
+    build_trie([p.encode() for p in patterns], AC)
+    build_fallback(AC)
+    dfa = DFA(AC)
+    data = text.encode()
+
+    start = time.perf_counter()
+    matches = sum(1 for match in dfa.finditer(data))
+    elapsed = time.perf_counter() - start
+    print("DFA bytes      %8.2f MB/s" % (len(data) / 2**20 / elapsed))
+    assert matches == found, "different number of matches"
@@ -0,0 +1,136 @@
+# Streaming Aho-Corasick search over bytes: files, sockets, mmap.
+#
+# search() needs the whole text as one string and prints the matches. For
+# multi GB inputs, the text has to come in chunks instead. The automaton
+# doesn't care where a chunk ends: everything it knows about the text so far
+# is its current state. So a StreamMatcher keeps the state (and the number
+# of bytes seen so far) between feed() calls, and a match that starts in one
+# chunk and ends in the next is found like any other.
+#
+# Matches are (pattern_id, start, end) with global byte offsets, end
+# exclusive: data[start:end] is the pattern. pattern_id is the index of the
+# pattern in the list the matcher was built from.
+#
+# The automaton is compiled into a DFA (see DFA in aho_corasick.py), so every
+# byte costs one table lookup. str patterns are encoded (utf-8 by default)
+# and matched against the raw bytes.
+
+
+import mmap
+import os
+
+from aho_corasick import DFA, aho_corasick, build_fallback, build_trie
+
+
+class StreamMatcher():
+    def __init__(self, patterns, encoding='utf-8'):
+        patterns = [p.encode(encoding) if isinstance(p, str) else bytes(p) for p in patterns]
+        if not all(patterns):
+            raise ValueError("empty pattern")
+
+        AC = aho_corasick()
+        build_trie(patterns, AC)
+        build_fallback(AC)
+        self.dfa = DFA(AC, byte_symbols=True) # feed() uses bytes as symbols
+
+        # pattern -> ids (the same pattern can be in the list more than once)
+        ids = {}
+        for pattern_id, pattern in enumerate(patterns):
+            ids.setdefault(pattern, []).append(pattern_id)
+
+        # For every state with outputs (in DFA order): (pattern_id, length)
+        # of every pattern that ends there
+        self.hits = [tuple((pattern_id, len(pattern)) for pattern in outputs for pattern_id in ids[pattern])
+                     for outputs in self.dfa.outputs]
+
+        self.reset()
+
+
+    # Start over, as if nothing had been fed yet
+    def reset(self):
+        self.state  = 0
+        self.offset = 0
+
+
+    # Feed the next chunk of the stream (bytes, bytearray, memoryview, ...).
+    # Returns the list of (pattern_id, start, end) that end in this chunk.
+    def feed(self, chunk):
+        table = self.dfa.table
+        width = self.dfa.width
+        first_output = self.dfa.first_output
+        hits = self.hits
+
+        state = self.state
+        end = self.offset + 1
+        matches = []
+
+        for c in memoryview(chunk).cast('B'):
+            state = table[state + c]
+            if state >= first_output:
+                for pattern_id, length in hits[(state - first_output) // width]:
+                    matches.append((pattern_id, end - length, end))
+            end += 1
+
+        self.state = state
+        self.offset = end - 1
+        return matches
+
+
+    # Yields the matches of a stream of chunks
+    def scan_chunks(self, chunks):
+        for chunk in chunks:
+            yield from self.feed(chunk)
+
+
+    # Yields the matches of a binary file object (open(..., 'rb'),
+    # socket.makefile('rb'), ...), read 'chunk_size' bytes at a time into one
+    # reused buffer.
+    def scan_stream(self, f, chunk_size=1 << 20):
+        buffer = bytearray(chunk_size)
+        view = memoryview(buffer)
+
+        while True:
+            size = f.readinto(buffer)
+            if not size:
+                break
+            yield from self.feed(view[:size])
+
+
+    # Yields the matches in the file at 'path'. Offsets are file offsets.
+    #
+    # With use_mmap, the file is mapped and fed in slices of 'chunk_size'
+    # bytes (no copies, the OS pages it in). Otherwise, large buffered reads.
+    def scan_file(self, path, chunk_size=1 << 20, use_mmap=True):
+        self.reset()
+
+        with open(path, 'rb') as f:
+            if not use_mmap or os.fstat(f.fileno()).st_size == 0:
+                # (an empty file can't be mapped)
+                yield from self.scan_stream(f, chunk_size)
+                return
+
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                view = memoryview(mm)
+                try:
+                    for start in range(0, len(mm), chunk_size):
+                        yield from self.feed(view[start:start + chunk_size])
+                finally:
+                    view.release()
+
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    matcher = StreamMatcher(["bar", "ara", "bara", "barbara"])
+
+    # "barbara" is split over three chunks
+    for chunk in [b"barbarian bar", b"ba", b"ra said: barabum"]:
+        print(chunk, matcher.feed(chunk))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "log.txt")
+        with open(path, "wb") as f:
+            f.write(b"barbarian barbara said: barabum")
+
+        print(list(matcher.scan_file(path, chunk_size=4)))
@@ -0,0 +1,183 @@
+# Compressed sparse row (CSR) graph.
+#
+# The graph modules (dijkstra.py, prim.py, kruskal.py) build object graphs:
+# a Vertex object per vertex, and an Edge object or a (Vertex, weight) tuple
+# per edge. Every edge costs hundreds of bytes and following an edge means
+# chasing pointers.
+#
+# A CSR graph stores the same thing in three flat arrays:
+#
+#   offsets: n + 1 entries. The edges going out of vertex u are at
+#            positions offsets[u] ... offsets[u + 1] - 1 of targets/weights.
+#   targets: m entries. The vertex (id) each edge goes to.
+#   weights: m entries. The weight of each edge.
+#
+# Vertices are integer ids 0 ... n-1. 'names' maps ids back to vertex names.
+#
+#   offsets: [0, 2, 3, 3]           vertex 0 -> 1 (w=1), 0 -> 2 (w=10)
+#   targets: [1, 2, 2]              vertex 1 -> 2 (w=2)
+#   weights: [1.0, 10.0, 2.0]       vertex 2 has no outgoing edges
+#
+# With array.array that's 4 bytes (target) + 8 bytes (weight) per edge and
+# 8 bytes (offset) per vertex. The arrays support the buffer protocol, so
+# numpy.frombuffer() gives a zero copy numpy view of them.
+#
+# An undirected graph stores every edge twice (u -> v and v -> u).
+#
+# The algorithms take a CSR graph through duck typing (n, offsets, targets,
+# weights), so they don't have to import this module:
+#   dijkstra.py: calculate_shortest_path_csr(graph, source)
+#   prim.py    : prim_csr(graph, start)
+#   kruskal.py : kruskal_csr(graph)
+
+
+from array import array
+
+
+class CSRGraph():
+    def __init__(self, offsets, targets, weights, names=None, directed=True):
+        self.offsets  = offsets
+        self.targets  = targets
+        self.weights  = weights
+        self.n        = len(offsets) - 1
+        self.names    = names if names is not None else list(range(self.n))
+        self.directed = directed
+        self.ids      = None # name -> id, built on first use
+
+
+    def __len__(self):
+        return self.n
+
+
+    def num_edges(self):
+        return len(self.targets)
+
+
+    def id_of(self, name):
+        if self.ids is None:
+            self.ids = {name: i for i, name in enumerate(self.names)}
+
+        return self.ids[name]
+
+
+    # (target, weight) pairs of the edges going out of 'u'
+    def neighbours(self, u):
+        start, end = self.offsets[u], self.offsets[u + 1]
+        return zip(self.targets[start:end], self.weights[start:end])
+
+
+    # All edges as (u, v, weight).
+    # For an undirected graph, every edge is reported once (with u <= v).
+    def edges(self):
+        offsets, targets, weights = self.offsets, self.targets, self.weights
+
+        for u in range(self.n):
+            for i in range(offsets[u], offsets[u + 1]):
+                v = targets[i]
+                if self.directed or u <= v:
+                    yield u, v, weights[i]
+
+
+    # Build from an iterable of (u, v, weight) with integer ids 0 ... n-1.
+    #
+    # Counting sort on 'u':
+    # 1. Count the out degree of every vertex.
+    # 2. Prefix sums of the degrees are the offsets.
+    # 3. Put every edge at the next free position of its source vertex.
+    # The edges are kept in compact arrays in between, never as tuples.
+    @classmethod
+    def from_edge_list(cls, n, edges, directed=True, names=None):
+        src = array('i')
+        dst = array('i')
+        wts = array('d')
+
+        for u, v, weight in edges:
+            if not (0 <= u < n and 0 <= v < n):
+                raise ValueError("edge (%r, %r) has a vertex outside 0 ... %d" % (u, v, n - 1))
+
+            src.append(u)
+            dst.append(v)
+            wts.append(weight)
+
+            if not directed and u != v:
+                src.append(v)
+                dst.append(u)
+                wts.append(weight)
+
+        offsets = array('q', [0]) * (n + 1)
+        for u in src:
+            offsets[u + 1] += 1
+        for u in range(n):
+            offsets[u + 1] += offsets[u]
+
+        targets = array('i', [0]) * len(src)
+        weights = array('d', [0.0]) * len(src)
+        next_free = offsets[:-1]
+
+        for i in range(len(src)):
+            u = src[i]
+            pos = next_free[u]
+            targets[pos] = dst[i]
+            weights[pos] = wts[i]
+            next_free[u] = pos + 1
+
+        return cls(offsets, targets, weights, names, directed)
+
+
+    # Build from Dijkstra style vertices (Vertex.adjacencyList holds
+    # (Vertex, weight) tuples). Directed. Vertices only reachable through
+    # adjacency lists are picked up as well.
+    @classmethod
+    def from_vertices(cls, vertexList):
+        vertices, ids = cls.number_vertices(vertexList)
+
+        i = 0
+        while i < len(vertices):
+            for v, weight in vertices[i].adjacencyList:
+                if id(v) not in ids:
+                    ids[id(v)] = len(vertices)
+                    vertices.append(v)
+            i += 1
+
+        edges = ((ids[id(vertex)], ids[id(v)], weight)
+                 for vertex in vertices for v, weight in vertex.adjacencyList)
+
+        return cls.from_edge_list(len(vertices), edges, True, [v.name for v in vertices])
+
+
+    # Build from Prim/Kruskal style Edge objects (startVertex, endVertex,
+    # weight). Undirected by default.
+    @classmethod
+    def from_edges(cls, vertexList, edgeList, directed=False):
+        vertices, ids = cls.number_vertices(vertexList)
+
+        edges = ((ids[id(e.startVertex)], ids[id(e.endVertex)], e.weight) for e in edgeList)
+
+        try:
+            return cls.from_edge_list(len(vertices), edges, directed, [v.name for v in vertices])
+        except KeyError:
+            raise ValueError("edge with a vertex that is not in vertexList")
+
+
+    # id(Vertex) -> integer id.
+    # The python object id is used because Vertex may define __eq__ (and so
+    # not be hashable).
+    @staticmethod
+    def number_vertices(vertexList):
+        vertices = []
+        ids = {}
+
+        for vertex in vertexList:
+            if id(vertex) not in ids:
+                ids[id(vertex)] = len(vertices)
+                vertices.append(vertex)
+
+        return vertices, ids
+
+
+
+if __name__ == "__main__":
+    g = CSRGraph.from_edge_list(3, [(0, 1, 1), (0, 2, 10), (1, 2, 2)], names=['A', 'B', 'C'])
+    print(g.offsets, g.targets, g.weights)
+    for u in range(g.n):
+        print(g.names[u], [(g.names[v], w) for v, w in g.neighbours(u)])
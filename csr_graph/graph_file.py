@@ -0,0 +1,287 @@
+# Binary on-disk format for CSR graphs (see csr_graph.py), opened with mmap.
+#
+# Parsing an edge list into objects on every process start is slow. Instead,
+# convert it once into this format. Opening it is then just an mmap: the
+# arrays are used in place (zero copy) and the OS pages them in on demand.
+# Several processes that open the same file share the same pages.
+#
+# Layout (little endian, every section starts at a multiple of 8 bytes):
+#
+#   header       : 64 bytes
+#                  magic    4s   b'CSRG'
+#                  version  u32  FORMAT_VERSION
+#                  flags    u32  bit 0 = directed
+#                  reserved u32
+#                  n        u64  number of vertices
+#                  m        u64  number of (directed) edges
+#                  namesize u64  size of the name blob in bytes
+#                  (zero padding)
+#   offsets      : (n + 1) x int64
+#   targets      : m x int32
+#   weights      : m x float64
+#   name offsets : (n + 1) x int64, name of vertex u is
+#                  blob[name_offsets[u] : name_offsets[u + 1]]
+#   name tags    : n bytes, type of the name of every vertex (see
+#                  vertex_names.py)
+#   name blob    : namesize bytes
+#
+# load() returns a CSRGraph whose offsets/targets/weights are memoryviews
+# into the mmap (or numpy arrays on top of it with use_numpy=True).
+
+
+import mmap
+import struct
+import sys
+from array import array
+
+from csr_graph import CSRGraph
+from vertex_names import decode_name, encode_names
+
+
+MAGIC = b'CSRG'
+FORMAT_VERSION = 2
+HEADER = struct.Struct('<4sIIIQQQ')
+HEADER_SIZE = 64
+
+FLAG_DIRECTED = 1
+
+
+def align8(x):
+    return (x + 7) & ~7
+
+
+# Byte offsets of each section in the file
+def layout(n, m, namesize):
+    offsets      = HEADER_SIZE
+    targets      = offsets + 8 * (n + 1)
+    weights      = targets + align8(4 * m)
+    name_offsets = weights + 8 * m
+    name_tags    = name_offsets + 8 * (n + 1)
+    names        = name_tags + align8(n)
+    end          = names + namesize
+    return offsets, targets, weights, name_offsets, name_tags, names, end
+
+
+# The memoryview casts below use the machine's byte order
+def check_byteorder():
+    if sys.byteorder != 'little':
+        raise NotImplementedError("graph files can only be used on little endian machines")
+
+
+
+# Lazy, read only list of vertex names backed by the file.
+# A name is only decoded when it is asked for.
+class NameTable():
+    def __init__(self, offsets, tags, blob):
+        self.offsets = offsets
+        self.tags = tags
+        self.blob = blob
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, u):
+        if u < 0:
+            u += len(self)
+        if not 0 <= u < len(self):
+            raise IndexError("vertex id out of range")
+        return decode_name(self.tags[u:u + 1], self.blob[self.offsets[u]:self.offsets[u + 1]])
+
+    def __iter__(self):
+        for u in range(len(self)):
+            yield self[u]
+
+
+
+def write_header(f, n, m, namesize, directed):
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, FLAG_DIRECTED if directed else 0, 0, n, m, namesize)
+    f.write(header + bytes(HEADER_SIZE - len(header)))
+
+
+def write_names(f, name_offsets, name_tags, blob):
+    f.write(name_offsets.tobytes())
+    f.write(name_tags + bytes(align8(len(name_tags)) - len(name_tags)))
+    f.write(blob)
+
+
+# Write an in memory CSRGraph to 'path'. Names can be str, int, float or
+# bytes and are loaded back as the same type.
+def save(graph, path):
+    check_byteorder()
+
+    name_offsets, name_tags, blob = encode_names(graph.names)
+    n, m = graph.n, graph.num_edges()
+
+    with open(path, 'wb') as f:
+        write_header(f, n, m, len(blob), graph.directed)
+        f.write(array('q', graph.offsets).tobytes())
+        targets = array('i', graph.targets).tobytes()
+        f.write(targets + bytes(align8(len(targets)) - len(targets)))
+        f.write(array('d', graph.weights).tobytes())
+        write_names(f, name_offsets, name_tags, blob)
+
+
+# Open a graph file. Nothing is copied, the returned graph reads straight
+# from the (shared, read only) mmap.
+def load(path, use_numpy=False):
+    check_byteorder()
+
+    with open(path, 'rb') as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    magic, version, flags, reserved, n, m, namesize = HEADER.unpack_from(mm, 0)
+    if magic != MAGIC:
+        raise ValueError("%s is not a graph file" % path)
+    if version != FORMAT_VERSION:
+        raise ValueError("%s has format version %d, expected %d" % (path, version, FORMAT_VERSION))
+
+    o_offsets, o_targets, o_weights, o_name_offsets, o_name_tags, o_names, end = layout(n, m, namesize)
+    if len(mm) < end:
+        raise ValueError("%s is truncated" % path)
+
+    if use_numpy:
+        import numpy as np
+        offsets = np.frombuffer(mm, np.int64, n + 1, o_offsets)
+        targets = np.frombuffer(mm, np.int32, m, o_targets)
+        weights = np.frombuffer(mm, np.float64, m, o_weights)
+    else:
+        view = memoryview(mm)
+        offsets = view[o_offsets:o_targets].cast('q')
+        targets = view[o_targets:o_targets + 4 * m].cast('i')
+        weights = view[o_weights:o_name_offsets].cast('d')
+
+    names = NameTable(memoryview(mm)[o_name_offsets:o_name_tags].cast('q'),
+                      memoryview(mm)[o_name_tags:o_name_tags + n],
+                      memoryview(mm)[o_names:end])
+
+    graph = CSRGraph(offsets, targets, weights, names, bool(flags & FLAG_DIRECTED))
+    graph.mmap = mm # keep the mapping alive as long as the graph
+    return graph
+
+
+
+# Parse one line of an edge list: "u v [weight]", separated by whitespace
+# or commas. Returns None for blank lines and '#' comments.
+def parse_line(line):
+    fields = line.replace(',', ' ').split()
+
+    if not fields or fields[0].startswith('#'):
+        return None
+    if len(fields) < 2:
+        raise ValueError("bad edge list line: %r" % line)
+
+    weight = float(fields[2]) if len(fields) > 2 else 1.0
+    return fields[0], fields[1], weight
+
+
+# Pass 1 of convert_edge_list(): give every vertex name an id and count out
+# degrees. Returns (ids, offsets, (name_offsets, name_tags, blob)), the list of
+# names and the degrees are only needed in here.
+def number_vertices(src_path, directed, encoding):
+    ids = {}
+    names = []
+    degree = array('q')
+
+    with open(src_path, encoding=encoding) as f:
+        for line in f:
+            edge = parse_line(line)
+            if edge is None:
+                continue
+
+            for name in edge[:2]:
+                if name not in ids:
+                    ids[name] = len(names)
+                    names.append(name)
+                    degree.append(0)
+
+            u = ids[edge[0]]
+            v = ids[edge[1]]
+
+            degree[u] += 1
+            if not directed and u != v:
+                degree[v] += 1
+
+    n = len(names)
+    offsets = array('q', [0]) * (n + 1)
+    for u in range(n):
+        offsets[u + 1] = offsets[u] + degree[u]
+
+    return ids, offsets, encode_names(names)
+
+
+# Convert a text edge list (CSV or whitespace separated, one edge per line)
+# into a graph file, without ever holding the text or the edges in memory.
+#
+# Two passes over the input:
+# 1. Give every vertex name an id and count out degrees. The offsets follow
+#    from the degrees, so the size of every section is now known.
+# 2. Create the output file at its final size, mmap it, and write every edge
+#    straight into the next free slot of its source vertex (counting sort).
+#
+# Memory is O(V) (the name -> id map and the degree/offset arrays).
+def convert_edge_list(src_path, dst_path, directed=True, encoding='utf-8'):
+    check_byteorder()
+
+    # Pass 1
+    ids, offsets, (name_offsets, name_tags, blob) = number_vertices(src_path, directed, encoding)
+    n = len(offsets) - 1
+    m = offsets[n]
+
+    o_offsets, o_targets, o_weights, o_name_offsets, o_name_tags, o_names, end = layout(n, m, len(blob))
+
+    with open(dst_path, 'wb') as out:
+        write_header(out, n, m, len(blob), directed)
+        out.write(offsets.tobytes())
+        out.seek(o_name_offsets)
+        write_names(out, name_offsets, name_tags, blob)
+        out.truncate(end)
+
+    # Pass 2
+    with open(dst_path, 'r+b') as out:
+        mm = mmap.mmap(out.fileno(), 0)
+        targets = memoryview(mm)[o_targets:o_targets + 4 * m].cast('i')
+        weights = memoryview(mm)[o_weights:o_name_offsets].cast('d')
+        next_free = offsets[:-1]
+
+        with open(src_path, encoding=encoding) as f:
+            for line in f:
+                edge = parse_line(line)
+                if edge is None:
+                    continue
+
+                u = ids[edge[0]]
+                v = ids[edge[1]]
+
+                pos = next_free[u]
+                targets[pos] = v
+                weights[pos] = edge[2]
+                next_free[u] = pos + 1
+
+                if not directed and u != v:
+                    pos = next_free[v]
+                    targets[pos] = u
+                    weights[pos] = edge[2]
+                    next_free[v] = pos + 1
+
+        targets.release()
+        weights.release()
+        mm.flush()
+        mm.close()
+
+
+
+if __name__ == "__main__":
+    import os
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as tmp:
+        src = os.path.join(tmp, "edges.csv")
+        dst = os.path.join(tmp, "edges.csrg")
+
+        with open(src, "w") as f:
+            f.write("# from,to,weight\nA,B,1\nA,C,10\nB,C,2\n")
+
+        convert_edge_list(src, dst)
+        g = load(dst)
+        for u in range(g.n):
+            print(g.names[u], [(g.names[v], w) for v, w in g.neighbours(u)])
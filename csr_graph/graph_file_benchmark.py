@@ -0,0 +1,75 @@
+# Cold start benchmark: object graph build vs graph file (mmap) load.
+#
+# Usage: python graph_file_benchmark.py [vertices] [edges]
+#
+# Writes a random edge list to a temporary directory and reports, for both
+# the Dijkstra object graph (Vertex + adjacencyList) and the graph file:
+#   load : time until the graph can be queried
+#   query: time of one single source shortest path query on it
+# The one time edge list -> graph file conversion is reported separately.
+#
+# The graph file is read through the page cache, so this measures a warm
+# cache. A truly cold read additionally pays for reading the file from disk
+# (but only for the pages that are actually touched).
+
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'dijkstras_shortest_path'))
+
+from dijkstra import Vertex, calculate_shortest_path_csr, calculate_shortest_path
+import graph_file
+
+
+def timed(f, *args):
+    start = time.perf_counter()
+    result = f(*args)
+    return result, time.perf_counter() - start
+
+
+def build_objects(path):
+    vertices = {}
+
+    def vertex(name):
+        v = vertices.get(name)
+        if v is None:
+            v = vertices[name] = Vertex(name)
+        return v
+
+    with open(path) as f:
+        for line in f:
+            edge = graph_file.parse_line(line)
+            if edge is not None:
+                vertex(edge[0]).adjacencyList.append((vertex(edge[1]), edge[2]))
+
+    return vertices
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    m = int(sys.argv[2]) if len(sys.argv) > 2 else 1000000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        src = os.path.join(tmp, "edges.txt")
+        dst = os.path.join(tmp, "edges.csrg")
+
+        rnd = random.Random(1)
+        with open(src, "w") as f:
+            for _ in range(m):
+                f.write("v%d v%d %d\n" % (rnd.randrange(n), rnd.randrange(n), rnd.randrange(1, 100)))
+
+        _, convert_time = timed(graph_file.convert_edge_list, src, dst)
+        print("n=%d m=%d  text=%.1f MB  graph file=%.1f MB  (one time conversion %.2f s)" %
+              (n, m, os.path.getsize(src) / 2**20, os.path.getsize(dst) / 2**20, convert_time))
+
+        vertices, build_time = timed(build_objects, src)
+        _, query_time = timed(calculate_shortest_path, vertices["v0"])
+        print("objects    load=%8.3f s  query=%6.2f s" % (build_time, query_time))
+
+        graph, load_time = timed(graph_file.load, dst)
+        _, query_time = timed(calculate_shortest_path_csr, graph, graph.id_of("v0"))
+        print("graph file load=%8.3f s  query=%6.2f s" % (load_time, query_time))
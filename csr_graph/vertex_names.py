@@ -0,0 +1,56 @@
+# Vertex names in binary files: graph files (graph_file.py) and contraction
+# hierarchy files (dijkstras_shortest_path/contraction_hierarchy.py).
+#
+# Every name is stored as its bytes plus a one byte type tag, so that it is
+# loaded back as the same type (a graph with the default int names 0 ... n-1
+# must still find vertex 0 after a round trip, not only "0").
+#
+# The decoders take bytes or memoryviews, so names can be decoded straight
+# from an mmap.
+
+
+from array import array
+
+
+# tag -> (type, name -> bytes, bytes -> name)
+NAME_TYPES = {
+    b's': (str,   lambda name: name.encode('utf-8'), lambda data: str(data, 'utf-8')),
+    b'i': (int,   lambda name: str(name).encode(),   lambda data: int(str(data, 'ascii'))),
+    b'f': (float, lambda name: repr(name).encode(),  lambda data: float(str(data, 'ascii'))),
+    b'b': (bytes, lambda name: name,                 lambda data: bytes(data)),
+}
+NAME_TAGS = {t: tag for tag, (t, encode, decode) in NAME_TYPES.items()}
+
+
+# Returns (name_offsets, name_tags, blob): name u is
+# blob[name_offsets[u]:name_offsets[u + 1]], with type tag name_tags[u].
+def encode_names(names):
+    name_offsets = array('q', [0])
+    name_tags = bytearray()
+    blob = bytearray()
+
+    for name in names:
+        tag = NAME_TAGS.get(type(name))
+        if tag is None:
+            raise ValueError("can't save vertex name %r of type %s" % (name, type(name).__name__))
+
+        name_tags += tag
+        blob += NAME_TYPES[tag][1](name)
+        name_offsets.append(len(blob))
+
+    return name_offsets, name_tags, blob
+
+
+def decode_name(tag, data):
+    name_type = NAME_TYPES.get(bytes(tag))
+    if name_type is None:
+        raise ValueError("vertex name of unknown type %r" % bytes(tag))
+    return name_type[2](data)
+
+
+
+if __name__ == "__main__":
+    names = ['A', 1, 2.5, b'raw']
+    name_offsets, name_tags, blob = encode_names(names)
+    print([decode_name(name_tags[u:u + 1], blob[name_offsets[u]:name_offsets[u + 1]])
+           for u in range(len(names))])
@@ -0,0 +1,88 @@
+# Dijkstra vs A* on the same point-to-point queries.
+#
+# Usage: python astar_benchmark.py [grid side] [queries]
+#
+# The graph is a road-like grid: vertices get jittered (x, y) coordinates and
+# are connected to their grid neighbours in both directions, with weight =
+# straight line distance * a random detour factor >= 1 (so the Euclidean
+# heuristic is admissible).
+#
+# Reports the average number of settled vertices and the average latency per
+# query for each search. Landmark preprocessing time is reported separately.
+
+
+import math
+import random
+import sys
+import time
+
+from dijkstra import (DijkstraEngine, EuclideanHeuristic, LandmarkHeuristic,
+                      Vertex)
+
+
+def grid_graph(side, rnd):
+    vertices = []
+    for row in range(side):
+        for col in range(side):
+            v = Vertex("%d,%d" % (row, col))
+            v.x = col + rnd.uniform(-0.3, 0.3)
+            v.y = row + rnd.uniform(-0.3, 0.3)
+            vertices.append(v)
+
+    def connect(a, b):
+        weight = math.hypot(a.x - b.x, a.y - b.y) * rnd.uniform(1.0, 1.5)
+        a.adjacencyList.append((b, weight))
+        b.adjacencyList.append((a, weight))
+
+    for row in range(side):
+        for col in range(side):
+            if col + 1 < side:
+                connect(vertices[row * side + col], vertices[row * side + col + 1])
+            if row + 1 < side:
+                connect(vertices[row * side + col], vertices[(row + 1) * side + col])
+
+    return vertices
+
+
+def run(name, search, queries):
+    settled = 0
+    stats = {}
+    costs = []
+
+    start = time.perf_counter()
+    for source, target in queries:
+        path, cost = search(source, target, stats)
+        settled += stats['settled']
+        costs.append(cost)
+    elapsed = time.perf_counter() - start
+
+    print("%-16s settled=%9.0f  latency=%8.2f ms" %
+          (name, settled / len(queries), elapsed / len(queries) * 1000))
+    return costs
+
+
+if __name__ == "__main__":
+    side = int(sys.argv[1]) if len(sys.argv) > 1 else 150
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+
+    rnd = random.Random(1)
+    vertices = grid_graph(side, rnd)
+    engine = DijkstraEngine(vertices)
+    queries = [(rnd.choice(vertices), rnd.choice(vertices)) for _ in range(count)]
+
+    start = time.perf_counter()
+    landmarks = LandmarkHeuristic(engine, 8)
+    print("%d vertices, %d queries (landmark preprocessing: %.2f s)" %
+          (len(vertices), count, time.perf_counter() - start))
+
+    euclidean = EuclideanHeuristic(engine)
+
+    reference = run("dijkstra", engine.shortest_path, queries)
+    results = [
+        run("bidirectional", engine.bidirectional_shortest_path, queries),
+        run("A* euclidean", lambda s, t, stats: engine.astar_shortest_path(s, t, euclidean, stats), queries),
+        run("A* landmarks", lambda s, t, stats: engine.astar_shortest_path(s, t, landmarks, stats), queries),
+    ]
+
+    for costs in results:
+        assert all(abs(a - b) < 1e-9 for a, b in zip(costs, reference)), "different path costs"
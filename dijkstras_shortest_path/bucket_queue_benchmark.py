@@ -0,0 +1,74 @@
+# Binary heap vs Dial's buckets vs radix heap, on graphs with integer weights.
+#
+# Usage: python bucket_queue_benchmark.py [grid side] [queries]
+#
+# The graph is a grid (both directions between neighbours) with random integer
+# weights. For a few maximum weights, every query runs with all the engines
+# that apply, and their distances are checked against the heap version.
+
+
+import random
+import sys
+import time
+
+from dijkstra import DijkstraEngine, Vertex
+
+
+def grid_graph(side, max_weight, rnd):
+    vertices = [Vertex("%d,%d" % (row, col)) for row in range(side) for col in range(side)]
+
+    def connect(a, b):
+        a.adjacencyList.append((b, rnd.randint(1, max_weight)))
+        b.adjacencyList.append((a, rnd.randint(1, max_weight)))
+
+    for row in range(side):
+        for col in range(side):
+            if col + 1 < side:
+                connect(vertices[row * side + col], vertices[row * side + col + 1])
+            if row + 1 < side:
+                connect(vertices[row * side + col], vertices[(row + 1) * side + col])
+
+    return vertices
+
+
+def run(query, sources):
+    start = time.perf_counter()
+    trees = [query(source) for source in sources]
+    return trees, (time.perf_counter() - start) / len(sources) * 1000
+
+
+
+if __name__ == "__main__":
+    side = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    print("%d vertices, %d queries, latency per query in ms" % (side * side, count))
+    print("%10s %10s %10s %10s   %s" % ("max weight", "heap", "dial", "radix", "query() uses"))
+
+    for max_weight in (10, 100, 1000, 10**6):
+        rnd = random.Random(max_weight)
+        vertices = grid_graph(side, max_weight, rnd)
+        engine = DijkstraEngine(vertices)
+        sources = [rnd.choice(vertices) for _ in range(count)]
+
+        reference, heap_time = run(engine.query_heap, sources)
+
+        times = []
+        for query in (engine.query_dial, engine.query_radix):
+            if query == engine.query_dial and max_weight > 10 * DijkstraEngine.DIAL_MAX_WEIGHT:
+                # Mostly empty buckets, not worth the wait
+                times.append(None)
+                continue
+
+            trees, elapsed = run(query, sources)
+            times.append(elapsed)
+            for tree, expected in zip(trees, reference):
+                assert tree.dist == expected.dist, "different distances"
+
+        if max_weight <= DijkstraEngine.DIAL_MAX_WEIGHT:
+            used = "dial"
+        else:
+            used = "heap"
+
+        print("%10d %10.1f %10s %10.1f   %s" % (max_weight, heap_time,
+              "-" if times[0] is None else "%.1f" % times[0], times[1], used))
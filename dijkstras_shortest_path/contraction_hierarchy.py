@@ -0,0 +1,392 @@
+# Contraction hierarchies (CH).
+#
+# For many point-to-point queries on one static graph. We pay once for
+# preprocessing, after which a query only looks at a tiny part of the graph.
+#
+# Preprocessing ("contraction"):
+# 1. Put the vertices in some order (least important first).
+# 2. Remove ("contract") the vertices one by one in that order. When 'v' is
+#    removed, every shortest path u -> v -> w that went through it has to be
+#    kept, so we add a "shortcut" edge u -> w with weight d(u,v) + d(v,w)
+#    (remembering that it goes through 'v'). A shortcut isn't needed if there
+#    is a "witness" path u -> w that doesn't go through 'v' and is no longer.
+#    We look for one with a small local Dijkstra (witness search).
+# 3. The rank of a vertex is its position in the order. Every edge (original
+#    or shortcut) now goes either "up" (to a higher rank) or "down".
+#
+# Query:
+#   Every shortest path can be turned into one that first only goes up and
+#   then only goes down (with shortcuts). So a bidirectional Dijkstra where
+#   the forward search only follows upward edges from 'source' and the
+#   backward search only follows (reversed) downward edges into 'target' finds
+#   it. Both searches stay in the small set of vertices above their start.
+#   Shortcuts in the result are unpacked back into original edges recursively
+#   through the vertex they went through.
+#
+# Ordering:
+#   Priority of a vertex (smallest is contracted first) =
+#     2 * edge difference (shortcuts it would add minus edges it would remove)
+#     + number of its neighbours already contracted
+#     + its level (1 + the highest level of a contracted neighbour).
+#   The last two spread the contraction evenly over the graph and keep the
+#   hierarchy shallow, which keeps the query search spaces small.
+#   Priorities change as the graph changes, so they are recomputed lazily:
+#   a popped vertex is only contracted if its fresh priority is still the
+#   smallest.
+#
+# This is pure python. On a 100 x 100 road-like grid, preprocessing takes
+# about a minute, and a query settles a few hundred vertices (a few ms).
+# DijkstraEngine.shortest_path() settles a large part of the graph instead.
+#
+# Build from the Vertex/adjacencyList graph of dijkstra.py. The result can be
+# saved to disk and loaded without the original graph (paths are then
+# reported as vertex names).
+
+
+import heapq
+import struct
+import sys
+from array import array
+
+if __name__ == "__main__":
+    # Vertex names are saved with the helpers of ../csr_graph/vertex_names.py.
+    # Scripts that import this module put that directory on sys.path
+    # themselves.
+    import os
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'csr_graph'))
+
+from dijkstra import DijkstraEngine
+from vertex_names import decode_name, encode_names
+
+
+MAGIC = b'CHIX'
+FORMAT_VERSION = 2
+HEADER = struct.Struct('<4sIQQQQ')
+
+
+class ContractionHierarchy():
+    def __init__(self, vertices, rank, up, down):
+        self.vertices = vertices # id -> Vertex (or name, if loaded from disk)
+        self.rank     = rank     # id -> position in the contraction order
+        self.up       = up       # (offsets, targets, weights, middles): edges u -> w with rank[w] > rank[u]
+        self.down     = down     # (offsets, sources, weights, middles): edges x -> u with rank[x] > rank[u],
+                                 # stored at u (i.e, the upward edges of the reversed graph)
+                                 # middle is the contracted vertex a shortcut goes through, -1 for an original edge.
+        self.ids = {getattr(v, 'name', v): i for i, v in enumerate(vertices)}
+
+
+    # Accepts a Vertex or a vertex name
+    def vertex_id(self, vertex):
+        try:
+            return self.ids[getattr(vertex, 'name', vertex)]
+        except KeyError:
+            raise ValueError("vertex %s is not part of this graph" % getattr(vertex, 'name', vertex))
+
+
+    @classmethod
+    def build(cls, vertexList, witness_limit=64):
+        engine = DijkstraEngine(vertexList)
+        n = len(engine.vertices)
+
+        if len(engine.ids) != len({v.name for v in engine.vertices}):
+            raise ValueError("vertex names must be unique")
+
+        # Working graph that shrinks as vertices get contracted.
+        # out_edges[u][w] = in_edges[w][u] = (weight, middle)
+        out_edges = [{} for _ in range(n)]
+        in_edges  = [{} for _ in range(n)]
+
+        for u, edges in enumerate(engine.adjacency):
+            for w, weight in edges:
+                if u != w and weight < out_edges[u].get(w, (float('inf'),))[0]:
+                    out_edges[u][w] = (weight, -1)
+                    in_edges[w][u]  = (weight, -1)
+
+        contracted_neighbours = [0] * n
+        level = [0] * n
+        rank = array('i', [0]) * n
+        up   = [None] * n
+        down = [None] * n
+
+        def priority(v, shortcuts):
+            edge_difference = len(shortcuts) - len(out_edges[v]) - len(in_edges[v])
+            return 2 * edge_difference + contracted_neighbours[v] + level[v]
+
+        heap = [(priority(v, cls.shortcuts_for(v, out_edges, in_edges, witness_limit)), v)
+                for v in range(n)]
+        heapq.heapify(heap)
+
+        next_rank = 0
+        while heap:
+            p, v = heapq.heappop(heap)
+
+            # Lazy update: contract 'v' only if it is still the least important
+            shortcuts = cls.shortcuts_for(v, out_edges, in_edges, witness_limit)
+            p = priority(v, shortcuts)
+            if heap and p > heap[0][0]:
+                heapq.heappush(heap, (p, v))
+                continue
+
+            for u, w, weight in shortcuts:
+                out_edges[u][w] = (weight, v)
+                in_edges[w][u]  = (weight, v)
+
+            # All remaining neighbours get a higher rank than 'v', so these
+            # edges are the final upward/downward edges of 'v'.
+            up[v]   = [(w, weight, middle) for w, (weight, middle) in out_edges[v].items()]
+            down[v] = [(u, weight, middle) for u, (weight, middle) in in_edges[v].items()]
+
+            for u in in_edges[v]:
+                del out_edges[u][v]
+                contracted_neighbours[u] += 1
+                level[u] = max(level[u], level[v] + 1)
+            for w in out_edges[v]:
+                del in_edges[w][v]
+                contracted_neighbours[w] += 1
+                level[w] = max(level[w], level[v] + 1)
+            out_edges[v] = in_edges[v] = None
+
+            rank[v] = next_rank
+            next_rank += 1
+
+        return cls(engine.vertices, rank, cls.to_csr(up), cls.to_csr(down))
+
+
+    # Shortcuts (u, w, weight) that contracting 'v' would need
+    @staticmethod
+    def shortcuts_for(v, out_edges, in_edges, witness_limit):
+        shortcuts = []
+
+        for u, (weight_uv, _) in in_edges[v].items():
+            targets = {w: weight_uv + weight_vw for w, (weight_vw, _) in out_edges[v].items() if w != u}
+            if not targets:
+                continue
+
+            # Witness search: local Dijkstra from 'u' that avoids 'v'. Stops at
+            # the longest path through 'v' or after 'witness_limit' settled
+            # vertices. Giving up early only costs an unnecessary shortcut.
+            max_dist = max(targets.values())
+            dist = {u: 0}
+            heap = [(0, u)]
+            settled = 0
+
+            while heap and settled < witness_limit:
+                d, x = heapq.heappop(heap)
+                if d > dist[x]:
+                    continue
+                if d > max_dist:
+                    break
+                settled += 1
+
+                for y, (weight, _) in out_edges[x].items():
+                    if y != v and d + weight < dist.get(y, float('inf')):
+                        dist[y] = d + weight
+                        heapq.heappush(heap, (d + weight, y))
+
+            for w, via_v in targets.items():
+                if dist.get(w, float('inf')) > via_v:
+                    shortcuts.append((u, w, via_v))
+
+        return shortcuts
+
+
+    # List of per vertex edge lists -> (offsets, targets, weights, middles)
+    @staticmethod
+    def to_csr(edge_lists):
+        offsets = array('q', [0])
+        targets = array('i')
+        weights = array('d')
+        middles = array('i')
+
+        for edges in edge_lists:
+            for target, weight, middle in edges:
+                targets.append(target)
+                weights.append(weight)
+                middles.append(middle)
+            offsets.append(len(targets))
+
+        return offsets, targets, weights, middles
+
+
+    # Bidirectional upward search. Returns (cost, meet, forward prev, backward prev).
+    def search(self, s, t):
+        inf = float('inf')
+        graphs = (self.up, self.down)
+        dist = ({s: 0}, {t: 0})
+        prev = ({s: None}, {t: None}) # vertex -> (previous vertex, middle of the edge)
+        heap = ([(0, s)], [(0, t)])
+
+        best = 0 if s == t else inf
+        meet = s if s == t else -1
+
+        while True:
+            # A side is done when its smallest distance can't improve 'best'
+            tops = [heap[i][0][0] if heap[i] and heap[i][0][0] < best else inf for i in (0, 1)]
+            if tops[0] == inf and tops[1] == inf:
+                break
+
+            side = 0 if tops[0] <= tops[1] else 1
+            d, u = heapq.heappop(heap[side])
+
+            if d > dist[side][u]:
+                continue
+
+            other = dist[1 - side].get(u)
+            if other is not None and d + other < best:
+                best = d + other
+                meet = u
+
+            offsets, targets, weights, middles = graphs[side]
+            this_dist = dist[side]
+            for i in range(offsets[u], offsets[u + 1]):
+                v = targets[i]
+                new_dist = d + weights[i]
+                if new_dist < this_dist.get(v, inf):
+                    this_dist[v] = new_dist
+                    prev[side][v] = (u, middles[i])
+                    heapq.heappush(heap[side], (new_dist, v))
+
+        return best, meet, prev[0], prev[1]
+
+
+    def distance(self, source, target):
+        return self.search(self.vertex_id(source), self.vertex_id(target))[0]
+
+
+    # Returns (list of vertices from source to target, cost).
+    # ([], inf) if target can't be reached.
+    def shortest_path(self, source, target):
+        cost, meet, forward, backward = self.search(self.vertex_id(source), self.vertex_id(target))
+
+        if meet == -1:
+            return [], cost
+
+        # source ... meet (upward edges, walked backwards)
+        edges = []
+        v = meet
+        while forward[v] is not None:
+            u, middle = forward[v]
+            edges.append((u, v, middle))
+            v = u
+        edges.reverse()
+
+        # meet ... target (downward edges)
+        u = meet
+        while backward[u] is not None:
+            v, middle = backward[u]
+            edges.append((u, v, middle))
+            u = v
+
+        ids = [edges[0][0]] if edges else [meet]
+        for u, v, middle in edges:
+            self.unpack(u, v, middle, ids)
+
+        return [self.vertices[i] for i in ids], cost
+
+
+    # Append the original path of edge u -> v (without 'u') to 'ids'
+    def unpack(self, u, v, middle, ids):
+        stack = [(u, v, middle)]
+        while stack:
+            u, v, middle = stack.pop()
+            if middle == -1:
+                ids.append(v)
+            else:
+                # u -> middle -> v. Push the second half first so that the
+                # first half is unpacked first.
+                stack.append((middle, v, self.middle_of(middle, v)))
+                stack.append((u, middle, self.middle_of(u, middle)))
+
+
+    # 'middle' of the edge u -> v in the hierarchy
+    def middle_of(self, u, v):
+        if self.rank[u] < self.rank[v]:
+            offsets, targets, weights, middles = self.up
+            x, y = u, v
+        else:
+            offsets, targets, weights, middles = self.down
+            x, y = v, u
+
+        for i in range(offsets[x], offsets[x + 1]):
+            if targets[i] == y:
+                return middles[i]
+
+        raise KeyError("no edge %d -> %d in the hierarchy" % (u, v))
+
+
+    # Binary file: header, rank, up CSR, down CSR, names (little endian).
+    # Names can be str, int, float or bytes (see csr_graph/vertex_names.py).
+    def save(self, path):
+        if sys.byteorder != 'little':
+            raise NotImplementedError("hierarchy files can only be used on little endian machines")
+
+        name_offsets, name_tags, blob = encode_names([getattr(v, 'name', v) for v in self.vertices])
+
+        with open(path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, FORMAT_VERSION, len(self.vertices),
+                                len(self.up[1]), len(self.down[1]), len(blob)))
+            self.rank.tofile(f)
+            for offsets, targets, weights, middles in (self.up, self.down):
+                offsets.tofile(f)
+                targets.tofile(f)
+                weights.tofile(f)
+                middles.tofile(f)
+            name_offsets.tofile(f)
+            f.write(name_tags)
+            f.write(blob)
+
+
+    @classmethod
+    def load(cls, path):
+        if sys.byteorder != 'little':
+            raise NotImplementedError("hierarchy files can only be used on little endian machines")
+
+        def read(f, typecode, count):
+            a = array(typecode)
+            a.fromfile(f, count)
+            return a
+
+        with open(path, 'rb') as f:
+            magic, version, n, m_up, m_down, namesize = HEADER.unpack(f.read(HEADER.size))
+            if magic != MAGIC:
+                raise ValueError("%s is not a contraction hierarchy file" % path)
+            if version != FORMAT_VERSION:
+                raise ValueError("%s has format version %d, expected %d" % (path, version, FORMAT_VERSION))
+
+            rank = read(f, 'i', n)
+            graphs = [(read(f, 'q', n + 1), read(f, 'i', m), read(f, 'd', m), read(f, 'i', m))
+                      for m in (m_up, m_down)]
+            name_offsets = read(f, 'q', n + 1)
+            name_tags = f.read(n)
+            blob = f.read(namesize)
+
+        names = [decode_name(name_tags[i:i + 1], blob[name_offsets[i]:name_offsets[i + 1]]) for i in range(n)]
+        return cls(names, rank, graphs[0], graphs[1])
+
+
+
+if __name__ == "__main__":
+    import os
+    import tempfile
+
+    from dijkstra import Vertex
+
+    v = [Vertex(name) for name in "ABCDEF"]
+    def connect(a, b, weight):
+        v[a].adjacencyList.append((v[b], weight))
+        v[b].adjacencyList.append((v[a], weight))
+    connect(0, 1, 1)
+    connect(1, 2, 2)
+    connect(2, 3, 1)
+    connect(3, 4, 3)
+    connect(0, 5, 4)
+    connect(5, 4, 10)
+
+    ch = ContractionHierarchy.build(v)
+    path, cost = ch.shortest_path(v[0], v[4])
+    print(cost, [x.name for x in path])
+
+    with tempfile.TemporaryDirectory() as tmp:
+        ch.save(os.path.join(tmp, "graph.ch"))
+        loaded = ContractionHierarchy.load(os.path.join(tmp, "graph.ch"))
+        print(loaded.shortest_path("A", "E"))
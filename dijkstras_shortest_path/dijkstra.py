@@ -1,4 +1,6 @@
 import heapq # for heap
+import math
+from array import array
 
 
 class Vertex():
@@ -86,12 +88,775 @@ def get_shortest_path(targetVertex):
 
 
 
-v1 = Vertex('A')
-v2 = Vertex('B')
-v3 = Vertex('C')
+# Reusable query engine.
+#
+# calculate_shortest_path() above stores its state (minDistanceToNode,
+# previousNode, visited) on the Vertex objects themselves. So a second query
+# needs every vertex to be reset first and two threads can't query the same
+# graph at the same time.
+#
+# The engine maps every vertex to an integer id once (0 ... n-1) and takes a
+# snapshot of the adjacency lists in terms of those ids. A query then keeps its
+# distances and predecessors in its own lists indexed by id, and never writes
+# to the graph or to the engine. Any number of queries (from any number of
+# threads) can run against one engine.
+#
+# The heap holds (distance, id) tuples, so comparisons are done on tuples of
+# numbers and not with Vertex.__lt__. Instead of a "visited" flag, an entry is
+# skipped when its distance is larger than the best distance we already have
+# for that vertex (it is a stale entry from before a shorter path was found).
+#
+# If the graph changes, either go through add_edge() / update_edge() /
+# remove_edge(), which change the adjacency list and the snapshot together,
+# or change adjacencyList directly and refresh() the vertices that changed
+# (or build a new engine). Every change bumps 'version', and changed_at
+# records the version of the last change of every vertex, so that anything
+# computed from an older version (e.g. the trees of spt_cache.py) can tell
+# that it is out of date.
+#
+# If all the weights are small non negative integers, query() doesn't use a
+# heap at all (see query_dial()).
+class DijkstraEngine():
+
+    DIAL_MAX_WEIGHT = 1000 # Largest integer weight for which query() uses Dial
+
+    def __init__(self, vertexList):
+        self.vertices = [] # id -> Vertex
+        self.ids = {}      # id(Vertex) -> id. Vertex defines __eq__ and so
+                           # isn't hashable, hence the python object id.
+
+        for vertex in vertexList:
+            self.add_vertex(vertex)
+
+        # Also pick up vertices that are only reachable through adjacency
+        # lists. self.vertices grows while we go over it.
+        i = 0
+        while i < len(self.vertices):
+            for v, weight in self.vertices[i].adjacencyList:
+                self.add_vertex(v)
+            i += 1
+
+        # adjacency[u] = list of (v, weight) tuples, u and v are ids
+        self.adjacency = [[(self.ids[id(v)], weight) for v, weight in vertex.adjacencyList]
+                          for vertex in self.vertices]
+
+        self.reversed = None # reverse_adjacency()
+
+        self.integer_weights = True # all weights are non negative integers
+        self.max_weight = 0
+        self.check_weights(self.adjacency)
+
+        self.version = 0     # number of changes so far
+        self.changed_at = {} # id -> version of its last change
+
+
+    # Keep integer_weights/max_weight up to date for these adjacency lists.
+    # After a refresh() they may be conservative (e.g. max_weight doesn't go
+    # down when the heaviest edge is removed), which is fine.
+    def check_weights(self, adjacency_lists):
+        for edges in adjacency_lists:
+            for v, weight in edges:
+                if self.integer_weights and not (isinstance(weight, int) and weight >= 0):
+                    self.integer_weights = False
+                if weight > self.max_weight:
+                    self.max_weight = weight
+
+
+    # Take a new snapshot of the adjacency list of 'vertex' after it has
+    # changed. Vertices that became reachable through it are added.
+    def refresh(self, vertex):
+        u = self.vertex_id(vertex)
+        new = len(self.vertices)
+
+        for v, weight in vertex.adjacencyList:
+            self.add_vertex(v)
+
+        # Vertices reachable from the newly added ones
+        i = new
+        while i < len(self.vertices):
+            for v, weight in self.vertices[i].adjacencyList:
+                self.add_vertex(v)
+            i += 1
+
+        for added in self.vertices[new:]:
+            self.adjacency.append([(self.ids[id(v)], weight) for v, weight in added.adjacencyList])
+        self.adjacency[u] = [(self.ids[id(v)], weight) for v, weight in vertex.adjacencyList]
+
+        self.check_weights([self.adjacency[u]] + self.adjacency[new:])
+        self.reversed = None
+
+        self.version += 1
+        self.changed_at[u] = self.version
+
+
+    # New edge u -> v (u is part of the graph, v is added if it isn't)
+    def add_edge(self, u, v, weight):
+        self.vertex_id(u)
+        u.adjacencyList.append((v, weight))
+        self.refresh(u)
+
+
+    # New weight for the edge(s) u -> v
+    def update_edge(self, u, v, weight):
+        self.vertex_id(u)
+        edges = u.adjacencyList
+        found = False
+        for i, (w, _) in enumerate(edges):
+            if w is v:
+                edges[i] = (v, weight)
+                found = True
+
+        if not found:
+            raise KeyError("no edge %s -> %s" % (u.name, v.name))
+        self.refresh(u)
+
+
+    # Remove the edge(s) u -> v
+    def remove_edge(self, u, v):
+        self.vertex_id(u)
+        edges = [(w, weight) for w, weight in u.adjacencyList if w is not v]
+
+        if len(edges) == len(u.adjacencyList):
+            raise KeyError("no edge %s -> %s" % (u.name, v.name))
+        u.adjacencyList[:] = edges
+        self.refresh(u)
+
+
+    def add_vertex(self, vertex):
+        if id(vertex) not in self.ids:
+            self.ids[id(vertex)] = len(self.vertices)
+            self.vertices.append(vertex)
+
+
+    def vertex_id(self, vertex):
+        try:
+            return self.ids[id(vertex)]
+        except KeyError:
+            raise ValueError("vertex %s is not part of this graph" % vertex.name)
+
+
+    # Shortest paths from 'source' to all other vertices.
+    #
+    # Picks the fastest way for the weights of this graph:
+    #   small non negative integers: Dial's bucket queue (query_dial)
+    #   anything else              : binary heap (query_heap)
+    # query_radix() is there for integer weights as well, but in python the
+    # heapq module (written in C) is faster (see bucket_queue_benchmark.py).
+    #
+    # They all give the same distances. When there are several shortest
+    # paths, they may pick different ones.
+    def query(self, source):
+        if self.integer_weights and self.max_weight <= self.DIAL_MAX_WEIGHT:
+            return self.query_dial(source)
+
+        return self.query_heap(source)
+
+
+    def query_heap(self, source):
+        s = self.vertex_id(source)
+        adjacency = self.adjacency
+
+        dist = [float('inf')] * len(self.vertices)
+        prev = [-1] * len(self.vertices)
+
+        dist[s] = 0
+        heap = [(0, s)]
+
+        while heap:
+            d, u = heapq.heappop(heap)
+
+            if d > dist[u]:
+                # Stale entry
+                continue
+
+            for v, weight in adjacency[u]:
+                new_dist = d + weight
+                if new_dist < dist[v]:
+                    dist[v] = new_dist
+                    prev[v] = u
+                    heapq.heappush(heap, (new_dist, v))
+
+        return ShortestPathTree(self, s, dist, prev)
+
+
+    # Dial's algorithm, for non negative integer weights <= C (max_weight).
+    #
+    # Instead of a heap, there is one bucket (list of vertices) per distance.
+    # We go through the distances 0, 1, 2, ... in order and settle the
+    # vertices in each bucket: no comparisons, O(1) per push and pop.
+    #
+    # All tentative distances are always within [d, d + C] of the current
+    # distance d, so C + 1 buckets used in a circle are enough.
+    #
+    # Empty buckets are skipped: a bytearray marks the non empty ones and
+    # bytearray.find() (a C loop) jumps to the next one, so distances that no
+    # vertex has cost (almost) nothing. Total cost: O(m + n * C) with a tiny
+    # constant for the n * C part, good for small C.
+    def query_dial(self, source):
+        s = self.vertex_id(source)
+        adjacency = self.adjacency
+
+        dist = [float('inf')] * len(self.vertices)
+        prev = [-1] * len(self.vertices)
+
+        num_buckets = self.max_weight + 1
+        buckets = [[] for _ in range(num_buckets)]
+        nonempty = bytearray(num_buckets) # 1 for buckets with entries
+
+        dist[s] = 0
+        buckets[0].append(s)
+        nonempty[0] = 1
+        pending = 1 # entries in all the buckets
+        d = 0
+
+        while pending:
+            i = d % num_buckets
+            bucket = buckets[i]
+
+            # Zero weight edges add to the bucket we are working on
+            while bucket:
+                u = bucket.pop()
+                pending -= 1
+
+                if dist[u] != d:
+                    # Stale entry
+                    continue
+
+                for v, weight in adjacency[u]:
+                    new_dist = d + weight
+                    if new_dist < dist[v]:
+                        dist[v] = new_dist
+                        prev[v] = u
+                        j = new_dist % num_buckets
+                        buckets[j].append(v)
+                        nonempty[j] = 1
+                        pending += 1
+
+            nonempty[i] = 0
+            if not pending:
+                break
+
+            # Next non empty bucket, going round the circle from i
+            j = nonempty.find(1, i + 1)
+            if j == -1:
+                j = nonempty.find(1, 0, i)
+            d += (j - i) % num_buckets
+
+        return ShortestPathTree(self, s, dist, prev)
+
+
+    # Dijkstra with a radix heap, for non negative integer weights of any size.
+    def query_radix(self, source):
+        s = self.vertex_id(source)
+        adjacency = self.adjacency
+
+        dist = [float('inf')] * len(self.vertices)
+        prev = [-1] * len(self.vertices)
+
+        dist[s] = 0
+        heap = RadixHeap()
+        heap.push(0, s)
+
+        while heap:
+            d, u = heap.pop()
+
+            if d > dist[u]:
+                # Stale entry
+                continue
+
+            for v, weight in adjacency[u]:
+                new_dist = d + weight
+                if new_dist < dist[v]:
+                    dist[v] = new_dist
+                    prev[v] = u
+                    heap.push(new_dist, v)
+
+        return ShortestPathTree(self, s, dist, prev)
+
+
+    # Shortest path from 'source' to 'target' only.
+    #
+    # Same as query(), but stops as soon as 'target' is popped from the heap
+    # (settled): its distance can't get any shorter after that. dist/prev are
+    # dicts, so a query that settles a handful of vertices doesn't pay for
+    # initializing arrays of the size of the whole graph.
+    #
+    # Returns (list of vertices from source to target, cost).
+    # ([], inf) if target can't be reached.
+    #
+    # If a 'stats' dict is given, stats['settled'] is set to the number of
+    # vertices that were settled.
+    def shortest_path(self, source, target, stats=None):
+        s = self.vertex_id(source)
+        t = self.vertex_id(target)
+        adjacency = self.adjacency
+
+        dist = {s: 0}
+        prev = {s: -1}
+        heap = [(0, s)]
+        settled = 0
+        result = [], float('inf')
+
+        while heap:
+            d, u = heapq.heappop(heap)
+
+            if d > dist[u]:
+                # Stale entry
+                continue
+
+            settled += 1
+
+            if u == t:
+                result = self.ids_to_vertices(self.walk(prev, t)[::-1]), d
+                break
+
+            for v, weight in adjacency[u]:
+                new_dist = d + weight
+                if new_dist < dist.get(v, float('inf')):
+                    dist[v] = new_dist
+                    prev[v] = u
+                    heapq.heappush(heap, (new_dist, v))
+
+        if stats is not None:
+            stats['settled'] = settled
+
+        return result
+
+
+    # Bidirectional search: a forward search from 'source' and a backward
+    # search from 'target' (over reversed edges), taking turns. Each one only
+    # has to get about half way, which settles far fewer vertices than one
+    # search that goes all the way.
+    #
+    # 'best' is the shortest source -> target path seen so far, through the
+    # vertex 'meet' that has been reached by both searches. Once the two heap
+    # tops add up to at least 'best', no path that is still undiscovered can
+    # be shorter, so we can stop.
+    #
+    # Returns (list of vertices from source to target, cost).
+    # ([], inf) if target can't be reached.
+    def bidirectional_shortest_path(self, source, target, stats=None):
+        s = self.vertex_id(source)
+        t = self.vertex_id(target)
+
+        if s == t:
+            return [self.vertices[s]], 0
+
+        adjacency = (self.adjacency, self.reverse_adjacency())
+        dist = ({s: 0}, {t: 0})
+        prev = ({s: -1}, {t: -1})
+        heap = ([(0, s)], [(0, t)])
+
+        best = float('inf')
+        meet = -1
+        settled = 0
+
+        while heap[0] and heap[1]:
+            if heap[0][0][0] + heap[1][0][0] >= best:
+                break
+
+            # Advance the side with the smaller heap top
+            side = 0 if heap[0][0][0] <= heap[1][0][0] else 1
+            d, u = heapq.heappop(heap[side])
+
+            if d > dist[side][u]:
+                # Stale entry
+                continue
+
+            settled += 1
+            this_dist, other_dist = dist[side], dist[1 - side]
+
+            for v, weight in adjacency[side][u]:
+                new_dist = d + weight
+                if new_dist < this_dist.get(v, float('inf')):
+                    this_dist[v] = new_dist
+                    prev[side][v] = u
+                    heapq.heappush(heap[side], (new_dist, v))
+
+                    if v in other_dist and new_dist + other_dist[v] < best:
+                        best = new_dist + other_dist[v]
+                        meet = v
+
+        if stats is not None:
+            stats['settled'] = settled
+
+        if meet == -1:
+            return [], float('inf')
+
+        ids = self.walk(prev[0], meet)[::-1] + self.walk(prev[1], meet)[1:]
+        return self.ids_to_vertices(ids), best
+
+
+    # A* search: Dijkstra that prefers vertices that look closer to 'target'.
+    #
+    # heuristic(u, t) estimates the remaining distance from vertex id 'u' to
+    # vertex id 't'. The heap is ordered by dist[u] + heuristic(u, t) instead
+    # of dist[u], so the search is pulled towards the target and settles far
+    # fewer vertices.
+    #
+    # The heuristic must never overestimate and must be consistent
+    # (heuristic(u, t) <= weight(u, v) + heuristic(v, t)) for the result to be
+    # the shortest path. All the heuristics below are. A heuristic that always
+    # returns 0 gives plain Dijkstra (shortest_path()).
+    #
+    # Returns (list of vertices from source to target, cost).
+    # ([], inf) if target can't be reached.
+    def astar_shortest_path(self, source, target, heuristic, stats=None):
+        s = self.vertex_id(source)
+        t = self.vertex_id(target)
+        adjacency = self.adjacency
+
+        dist = {s: 0}
+        prev = {s: -1}
+        heap = [(heuristic(s, t), 0, s)] # (estimated total, distance, vertex)
+        settled = 0
+        result = [], float('inf')
+
+        while heap:
+            f, d, u = heapq.heappop(heap)
+
+            if d > dist[u]:
+                # Stale entry
+                continue
+
+            settled += 1
+
+            if u == t:
+                result = self.ids_to_vertices(self.walk(prev, t)[::-1]), d
+                break
+
+            for v, weight in adjacency[u]:
+                new_dist = d + weight
+                if new_dist < dist.get(v, float('inf')):
+                    dist[v] = new_dist
+                    prev[v] = u
+                    heapq.heappush(heap, (new_dist + heuristic(v, t), new_dist, v))
+
+        if stats is not None:
+            stats['settled'] = settled
+
+        return result
+
+
+    # Single source distances over the reversed graph, i.e, the distance
+    # from every vertex *to* 'target'. Returns a list indexed by id.
+    def distances_to(self, target):
+        t = self.vertex_id(target)
+        adjacency = self.reverse_adjacency()
+
+        dist = [float('inf')] * len(self.vertices)
+        dist[t] = 0
+        heap = [(0, t)]
+
+        while heap:
+            d, u = heapq.heappop(heap)
+
+            if d > dist[u]:
+                continue
+
+            for v, weight in adjacency[u]:
+                if d + weight < dist[v]:
+                    dist[v] = d + weight
+                    heapq.heappush(heap, (d + weight, v))
+
+        return dist
+
+
+    # Adjacency lists of the reversed graph (built on first use)
+    def reverse_adjacency(self):
+        if self.reversed is None:
+            reversed_adjacency = [[] for _ in self.vertices]
+            for u, edges in enumerate(self.adjacency):
+                for v, weight in edges:
+                    reversed_adjacency[v].append((u, weight))
+            self.reversed = reversed_adjacency
+
+        return self.reversed
+
+
+    # Follow prev pointers from 'u' back to the start of a search.
+    # Returns the ids starting at 'u'.
+    def walk(self, prev, u):
+        ids = []
+        while u != -1:
+            ids.append(u)
+            u = prev[u]
+        return ids
+
+
+    def ids_to_vertices(self, ids):
+        return [self.vertices[i] for i in ids]
+
+
+
+# Heuristics for DijkstraEngine.astar_shortest_path().
+#
+# Each one is built once for an engine and precomputes what it needs into
+# arrays indexed by vertex id, so that a call during the search is just a
+# few array lookups.
+
+
+# Straight line distance for vertices with (x, y) coordinates.
+#
+# position(vertex) returns the coordinates of a vertex (default: vertex.x,
+# vertex.y). 'scale' converts a coordinate distance into edge weight units.
+# Only admissible if no edge is shorter than the straight line between its
+# two vertices (times scale).
+class EuclideanHeuristic():
+    def __init__(self, engine, position=lambda v: (v.x, v.y), scale=1.0):
+        self.xs = array('d', [0.0]) * len(engine.vertices)
+        self.ys = array('d', [0.0]) * len(engine.vertices)
+        self.scale = scale
+
+        for i, vertex in enumerate(engine.vertices):
+            self.xs[i], self.ys[i] = position(vertex)
+
+    def __call__(self, u, t):
+        return self.scale * math.hypot(self.xs[u] - self.xs[t], self.ys[u] - self.ys[t])
+
+
+
+# Great circle distance for vertices with (latitude, longitude) in degrees.
+#
+# position(vertex) returns (lat, lon) of a vertex (default: vertex.lat,
+# vertex.lon). The distance is in meters on a sphere of 'radius' meters, times
+# 'scale' to convert meters into edge weight units (e.g. 1 / max speed in m/s
+# for travel time weights).
+class HaversineHeuristic():
+    EARTH_RADIUS = 6371000.0 # meters (mean radius)
+
+    def __init__(self, engine, position=lambda v: (v.lat, v.lon), scale=1.0, radius=EARTH_RADIUS):
+        self.lats = array('d', [0.0]) * len(engine.vertices)
+        self.lons = array('d', [0.0]) * len(engine.vertices)
+        self.coslats = array('d', [0.0]) * len(engine.vertices)
+        self.factor = 2 * radius * scale
+
+        for i, vertex in enumerate(engine.vertices):
+            lat, lon = position(vertex)
+            self.lats[i] = math.radians(lat)
+            self.lons[i] = math.radians(lon)
+            self.coslats[i] = math.cos(self.lats[i])
+
+    def __call__(self, u, t):
+        a = (math.sin((self.lats[t] - self.lats[u]) / 2) ** 2 +
+             self.coslats[u] * self.coslats[t] * math.sin((self.lons[t] - self.lons[u]) / 2) ** 2)
+        return self.factor * math.asin(min(1.0, math.sqrt(a)))
+
+
+
+# ALT (A*, Landmarks, Triangle inequality) heuristic. Needs no coordinates.
+#
+# For a landmark L, the triangle inequality gives two lower bounds on the
+# distance from u to t:
+#   d(u, t) >= d(u, L) - d(t, L)
+#   d(u, t) >= d(L, t) - d(L, u)
+# The heuristic is the best such bound over all landmarks.
+#
+# d(L, .) and d(., L) are computed once per landmark (a forward and a backward
+# Dijkstra over the whole graph) and stored as arrays indexed by vertex id.
+#
+# 'landmarks' is a list of vertices or a number of landmarks to pick. Picked
+# landmarks are spread out with the "farthest" method: each new landmark is
+# the vertex that is farthest from the ones already picked. Landmarks at the
+# edge of the graph give the best bounds.
+class LandmarkHeuristic():
+    def __init__(self, engine, landmarks=8):
+        if isinstance(landmarks, int):
+            landmarks = self.select_landmarks(engine, landmarks)
+
+        self.landmarks = landmarks
+        self.dist_from = [] # dist_from[i][u] = d(landmark i, u)
+        self.dist_to   = [] # dist_to[i][u]   = d(u, landmark i)
+
+        for landmark in landmarks:
+            self.dist_from.append(array('d', engine.query(landmark).dist))
+            self.dist_to.append(array('d', engine.distances_to(landmark)))
+
+
+    @staticmethod
+    def select_landmarks(engine, count):
+        if not engine.vertices:
+            return []
+
+        landmarks = [engine.vertices[0]]
+        closest = array('d', engine.query(landmarks[0]).dist) # distance to the nearest landmark
+
+        while len(landmarks) < count:
+            # Farthest reachable vertex from all the landmarks so far
+            best, best_dist = -1, 0
+            for i, d in enumerate(closest):
+                if d != float('inf') and d > best_dist:
+                    best, best_dist = i, d
+
+            if best == -1:
+                break
+
+            landmarks.append(engine.vertices[best])
+            for i, d in enumerate(engine.query(landmarks[-1]).dist):
+                if d < closest[i]:
+                    closest[i] = d
+
+        return landmarks
+
+
+    def __call__(self, u, t):
+        inf = float('inf')
+        best = 0
+
+        for dist_from, dist_to in zip(self.dist_from, self.dist_to):
+            # Bounds that involve an unreachable vertex tell us nothing
+            if dist_to[t] != inf and dist_to[u] != inf and dist_to[u] - dist_to[t] > best:
+                best = dist_to[u] - dist_to[t]
+            if dist_from[u] != inf and dist_from[t] != inf and dist_from[t] - dist_from[u] > best:
+                best = dist_from[t] - dist_from[u]
+
+        return best
+
+
+
+# Radix heap: a priority queue for non negative integer keys where a popped
+# key is never smaller than the previous popped key ("monotone"), which is
+# the case in Dijkstra.
+#
+# 'last' is the last popped key. An entry with key k goes into bucket
+# (k XOR last).bit_length(), i.e, the position of the highest bit in which k
+# differs from last. Bucket 0 holds keys equal to last.
+#
+# pop(): if bucket 0 is empty, take the first non empty bucket, make its
+# smallest key the new 'last' and redistribute its entries. They all land in
+# lower buckets, so every entry moves down at most (number of bits) times.
+# No comparisons between entries other than finding that minimum.
+class RadixHeap():
+    def __init__(self):
+        self.buckets = [[]]
+        self.last = 0
+        self.size = 0
+
+
+    def __len__(self):
+        return self.size
+
+
+    def push(self, key, value):
+        i = (key ^ self.last).bit_length()
+        while i >= len(self.buckets):
+            self.buckets.append([])
+
+        self.buckets[i].append((key, value))
+        self.size += 1
+
+
+    def pop(self):
+        if self.size == 0:
+            raise IndexError("pop from empty heap")
+
+        buckets = self.buckets
+
+        if not buckets[0]:
+            i = 1
+            while not buckets[i]:
+                i += 1
+
+            entries = buckets[i]
+            buckets[i] = []
+            self.last = last = min(entries)[0]
+
+            for entry in entries:
+                buckets[(entry[0] ^ last).bit_length()].append(entry)
+
+        self.size -= 1
+        return buckets[0].pop()
+
+
+
+# Result of DijkstraEngine.query()
+class ShortestPathTree():
+    def __init__(self, engine, source, dist, prev):
+        self.engine = engine
+        self.source = source # id of the source vertex
+        self.dist = dist     # id -> min distance from source (inf if unreachable)
+        self.prev = prev     # id -> id of the previous vertex on the shortest path (-1 if none)
+
+
+    # Vertices added to the engine after the query (DijkstraEngine.refresh())
+    # have no entry and weren't reachable.
+    def distance(self, target):
+        t = self.engine.vertex_id(target)
+        return self.dist[t] if t < len(self.dist) else float('inf')
+
+
+    # List of vertices from source to target. Empty if target is unreachable.
+    def path(self, target):
+        t = self.engine.vertex_id(target)
+
+        if t >= len(self.dist) or self.dist[t] == float('inf'):
+            return []
+
+        ids = []
+        while t != -1:
+            ids.append(t)
+            t = self.prev[t]
+
+        return [self.engine.vertices[i] for i in reversed(ids)]
+
+
+
+
+# Dijkstra over a CSR graph (see csr_graph/csr_graph.py).
+#
+# 'graph' is anything with n, offsets, targets and weights (vertex u's edges
+# are at offsets[u] ... offsets[u + 1] - 1 of targets/weights). 'source' is a
+# vertex id.
+#
+# Returns (dist, prev) arrays indexed by vertex id. dist is inf and prev is -1
+# for unreachable vertices.
+def calculate_shortest_path_csr(graph, source):
+    offsets, targets, weights = graph.offsets, graph.targets, graph.weights
+
+    dist = array('d', [float('inf')]) * graph.n
+    prev = array('q', [-1]) * graph.n
+
+    dist[source] = 0
+    heap = [(0, source)]
+
+    while heap:
+        d, u = heapq.heappop(heap)
+
+        if d > dist[u]:
+            # Stale entry
+            continue
+
+        for i in range(offsets[u], offsets[u + 1]):
+            v = targets[i]
+            new_dist = d + weights[i]
+            if new_dist < dist[v]:
+                dist[v] = new_dist
+                prev[v] = u
+                heapq.heappush(heap, (new_dist, v))
+
+    return dist, prev
+
+
+
+
+if __name__ == "__main__":
+    v1 = Vertex('A')
+    v2 = Vertex('B')
+    v3 = Vertex('C')
+
+    v1.adjacencyList = [(v2, 1), (v3, 10)]
+    v2.adjacencyList = [(v3, 2)]
+
+    calculate_shortest_path(v1)
+    get_shortest_path(v3)
+
+    print()
+    engine = DijkstraEngine([v1, v2, v3])
+    tree = engine.query(v1)
+    print(tree.distance(v3), [v.name for v in tree.path(v3)])
 
-v1.adjacencyList = [(v2, 1), (v3, 10)]
-v2.adjacencyList = [(v3, 2)]
+    path, cost = engine.bidirectional_shortest_path(v1, v3)
+    print(cost, [v.name for v in path])
 
-calculate_shortest_path(v1)
-get_shortest_path(v3)
+    path, cost = engine.astar_shortest_path(v1, v3, LandmarkHeuristic(engine, 2))
+    print(cost, [v.name for v in path])
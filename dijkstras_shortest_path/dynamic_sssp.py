@@ -0,0 +1,166 @@
+# Incremental single source shortest paths.
+#
+# When a few edge weights change, most of a shortest path tree stays the same.
+# Instead of running Dijkstra on the whole graph again, repair only the part
+# of the tree that the changes affect (in the style of Ramalingam-Reps).
+#
+# For a batch of changes:
+# 1. Weight increase / edge removal of a *tree* edge u -> v: every vertex in
+#    the subtree below v loses its path, so the subtree is "affected". Its
+#    distances are reset to inf. (Increasing or removing a non tree edge
+#    changes nothing.)
+# 2. Every affected vertex gets the best distance it can get in one step
+#    from an unaffected vertex (whose distance is still correct) and goes
+#    into the heap.
+# 3. Weight decrease / new edge u -> v: if it gives v a shorter distance,
+#    v gets it and goes into the heap.
+# 4. Run Dijkstra from what is in the heap. It only goes as far as distances
+#    actually change.
+#
+# Unaffected vertices keep their old distances during the repair. Their
+# shortest paths don't use any increased edge, so those distances are still
+# possible and nothing can have made them longer. They can only get shorter
+# (step 3/4).
+#
+# The tree keeps its own copy of the graph as dicts (out_edges[u][v] = weight,
+# in_edges[v][u] = weight). Parallel edges collapse into the lightest one.
+# Changes are made through set_edge/remove_edge/apply, not through
+# Vertex.adjacencyList.
+
+
+import heapq
+
+from dijkstra import ShortestPathTree
+
+
+class DynamicShortestPathTree(ShortestPathTree):
+    # 'tree' is a DijkstraEngine.query() result. Its distances are copied.
+    def __init__(self, tree):
+        ShortestPathTree.__init__(self, tree.engine, tree.source, list(tree.dist), list(tree.prev))
+
+        n = len(self.engine.vertices)
+        self.out_edges = [{} for _ in range(n)]
+        self.in_edges  = [{} for _ in range(n)]
+
+        for u, edges in enumerate(self.engine.adjacency):
+            for v, weight in edges:
+                if weight < self.out_edges[u].get(v, float('inf')):
+                    self.out_edges[u][v] = weight
+                    self.in_edges[v][u]  = weight
+
+
+    def set_edge(self, u, v, weight):
+        return self.apply([(u, v, weight)])
+
+
+    def remove_edge(self, u, v):
+        return self.apply([(u, v, None)])
+
+
+    # Apply a batch of (u, v, weight) changes (u and v are vertices).
+    # weight None removes the edge. An edge that doesn't exist yet is added.
+    #
+    # Returns the number of vertices whose distance was recomputed.
+    def apply(self, changes):
+        dist, prev = self.dist, self.prev
+        inf = float('inf')
+
+        roots = []      # vertices whose tree edge got worse
+        decreased = []  # (u, v) edges that got better
+
+        for source_vertex, target_vertex, weight in changes:
+            u = self.engine.vertex_id(source_vertex)
+            v = self.engine.vertex_id(target_vertex)
+            old = self.out_edges[u].get(v)
+
+            if weight is None:
+                if old is None:
+                    continue
+                del self.out_edges[u][v]
+                del self.in_edges[v][u]
+            else:
+                self.out_edges[u][v] = weight
+                self.in_edges[v][u]  = weight
+
+            if (weight is None or (old is not None and weight > old)) and prev[v] == u:
+                roots.append(v)
+            if weight is not None and (old is None or weight < old):
+                decreased.append((u, v))
+
+        # Step 1: everything below the roots in the tree
+        affected = set()
+        stack = list(roots)
+        while stack:
+            x = stack.pop()
+            if x in affected:
+                continue
+            affected.add(x)
+            for y in self.out_edges[x]:
+                if prev[y] == x:
+                    stack.append(y)
+
+        for x in affected:
+            dist[x] = inf
+            prev[x] = -1
+
+        heap = []
+
+        # Step 2: best way into each affected vertex from outside
+        for x in affected:
+            for y, weight in self.in_edges[x].items():
+                if dist[y] + weight < dist[x]:
+                    dist[x] = dist[y] + weight
+                    prev[x] = y
+            if dist[x] != inf:
+                heap.append((dist[x], x))
+
+        # Step 3: edges that got better
+        for u, v in decreased:
+            weight = self.out_edges[u].get(v)
+            if weight is None:
+                # Removed again later in the same batch
+                continue
+            if dist[u] + weight < dist[v]:
+                dist[v] = dist[u] + weight
+                prev[v] = u
+                heap.append((dist[v], v))
+
+        # Step 4
+        heapq.heapify(heap)
+        settled = 0
+
+        while heap:
+            d, x = heapq.heappop(heap)
+
+            if d > dist[x]:
+                # Stale entry
+                continue
+
+            settled += 1
+
+            for y, weight in self.out_edges[x].items():
+                if d + weight < dist[y]:
+                    dist[y] = d + weight
+                    prev[y] = x
+                    heapq.heappush(heap, (d + weight, y))
+
+        return settled
+
+
+
+if __name__ == "__main__":
+    from dijkstra import DijkstraEngine, Vertex
+
+    a, b, c, d = Vertex('A'), Vertex('B'), Vertex('C'), Vertex('D')
+    a.adjacencyList = [(b, 1), (c, 10)]
+    b.adjacencyList = [(c, 2)]
+    c.adjacencyList = [(d, 1)]
+
+    tree = DynamicShortestPathTree(DijkstraEngine([a, b, c, d]).query(a))
+    print(tree.distance(d), [v.name for v in tree.path(d)])
+
+    tree.set_edge(b, c, 20)  # tree edge gets worse: C and D are repaired
+    print(tree.distance(d), [v.name for v in tree.path(d)])
+
+    tree.set_edge(a, d, 2)   # new, better edge
+    print(tree.distance(d), [v.name for v in tree.path(d)])
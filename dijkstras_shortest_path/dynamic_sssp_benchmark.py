@@ -0,0 +1,68 @@
+# Incremental repair vs full recomputation after edge weight changes.
+#
+# Usage: python dynamic_sssp_benchmark.py [grid side] [batches per size]
+#
+# On a road-like grid (see astar_benchmark.py), random batches of edge weight
+# changes (each edge gets 0.5x ... 2x its weight, "traffic") are applied to a
+# DynamicShortestPathTree and, for comparison, to the graph followed by a full
+# DijkstraEngine.query(). Reports the average time per batch and the average
+# number of vertices the repair touched.
+
+
+import random
+import sys
+import time
+
+from astar_benchmark import grid_graph
+from dijkstra import DijkstraEngine
+from dynamic_sssp import DynamicShortestPathTree
+
+
+BATCH_SIZES = [1, 5, 20, 100]
+
+
+def random_changes(vertices, size, rnd):
+    changes = []
+    for _ in range(size):
+        u = rnd.choice(vertices)
+        i = rnd.randrange(len(u.adjacencyList))
+        v, weight = u.adjacencyList[i]
+        changes.append((u, i, v, weight * rnd.uniform(0.5, 2.0)))
+    return changes
+
+
+if __name__ == "__main__":
+    side = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    batches = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+    rnd = random.Random(1)
+    vertices = grid_graph(side, rnd)
+    engine = DijkstraEngine(vertices)
+    source = vertices[0]
+    tree = DynamicShortestPathTree(engine.query(source))
+
+    print("%d vertices" % len(vertices))
+    print("batch size   incremental   touched   full recompute")
+
+    for size in BATCH_SIZES:
+        incremental = full = touched = 0
+
+        for _ in range(batches):
+            changes = random_changes(vertices, size, rnd)
+
+            start = time.perf_counter()
+            touched += tree.apply([(u, v, weight) for u, i, v, weight in changes])
+            incremental += time.perf_counter() - start
+
+            for u, i, v, weight in changes:
+                u.adjacencyList[i] = (v, weight)
+                engine.refresh(u)
+
+            start = time.perf_counter()
+            result = engine.query(source)
+            full += time.perf_counter() - start
+
+            assert all(abs(a - b) < 1e-9 for a, b in zip(result.dist, tree.dist))
+
+        print("%10d   %8.2f ms   %7.0f   %11.2f ms" %
+              (size, incremental / batches * 1000, touched / batches, full / batches * 1000))
@@ -0,0 +1,275 @@
+# Distances from many sources at once, over a pool of worker processes.
+#
+# Every source is an independent single source Dijkstra, so a batch of
+# sources splits perfectly over processes. What makes or breaks the scaling is
+# the graph: pickling it into every task costs more than the searches.
+#
+# Instead, the graph is copied once into a block of shared memory as CSR
+# arrays (see csr_graph.py):
+#
+#   offsets: (n + 1) x int64
+#   targets: m x int32 (padded to a multiple of 8 bytes)
+#   weights: m x float64
+#
+# Every worker attaches to it when it starts and reads it in place, so a task
+# is just a range of source indices. distances() also puts the result matrix
+# in shared memory and the workers write their rows straight into it, so
+# nothing but the task ranges is ever pickled. iter_distances() sends every
+# row back instead (for batches whose matrix doesn't fit in memory).
+#
+# The vertex objects aren't touched (unlike calculate_shortest_path, which
+# stores minDistance/predecessor on them).
+
+
+import os
+from array import array
+from multiprocessing import Pool, shared_memory
+
+from dijkstra import DijkstraEngine, calculate_shortest_path_csr
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def align8(x):
+    return (x + 7) & ~7
+
+
+# CSR arrays on top of a shared memory block. Duck types as a CSR graph
+# (n, offsets, targets, weights) for calculate_shortest_path_csr.
+class SharedGraph():
+    def __init__(self, shm, n, m):
+        self.shm = shm
+        self.n = n
+        self.m = m
+
+        o_targets = 8 * (n + 1)
+        o_weights = o_targets + align8(4 * m)
+
+        view = shm.buf
+        self.offsets = view[:o_targets].cast('q')
+        self.targets = view[o_targets:o_targets + 4 * m].cast('i')
+        self.weights = view[o_weights:o_weights + 8 * m].cast('d')
+
+
+    # Copy CSR arrays into a new shared memory block
+    @classmethod
+    def create(cls, n, offsets, targets, weights):
+        m = len(targets)
+        size = 8 * (n + 1) + align8(4 * m) + 8 * m
+
+        shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        graph = cls(shm, n, m)
+        graph.offsets[:] = array('q', offsets)
+        graph.targets[:] = array('i', targets)
+        graph.weights[:] = array('d', weights)
+        return graph
+
+
+    def close(self):
+        self.offsets.release()
+        self.targets.release()
+        self.weights.release()
+        self.shm.close()
+
+
+
+# State of a worker process, set up once by attach()
+worker = {}
+
+
+def attach(graph_name, n, m, sources, targets, out_name):
+    graph_shm = shared_memory.SharedMemory(graph_name)
+    worker['graph'] = SharedGraph(graph_shm, n, m)
+    worker['sources'] = sources
+    worker['targets'] = targets
+
+    if out_name is not None:
+        cols = n if targets is None else len(targets)
+        worker['out_shm'] = shared_memory.SharedMemory(out_name)
+        worker['out'] = worker['out_shm'].buf[:8 * len(sources) * cols].cast('d')
+    else:
+        worker['out'] = None
+
+
+def detach():
+    if worker.get('out') is not None:
+        worker['out'].release()
+        worker['out_shm'].close()
+    worker['graph'].close()
+    worker.clear()
+
+
+# Distance rows of sources[start:end].
+# Written into the shared result matrix if there is one, returned otherwise.
+def solve(task):
+    start, end = task
+    graph, sources, targets, out = worker['graph'], worker['sources'], worker['targets'], worker['out']
+    rows = []
+
+    for i in range(start, end):
+        dist, prev = calculate_shortest_path_csr(graph, sources[i])
+        if targets is not None:
+            dist = array('d', [dist[t] for t in targets])
+
+        if out is not None:
+            out[i * len(dist):(i + 1) * len(dist)] = dist
+        else:
+            rows.append(dist)
+
+    return rows
+
+
+
+class ParallelDistances():
+    # 'graph' is a CSR graph (n, offsets, targets, weights), sources and
+    # targets are then vertex ids. Or a list of Dijkstra Vertex objects,
+    # sources and targets are then vertices.
+    def __init__(self, graph):
+        if hasattr(graph, 'offsets'):
+            self.engine = None
+            self.shared = SharedGraph.create(graph.n, graph.offsets, graph.targets, graph.weights)
+        else:
+            self.engine = DijkstraEngine(graph)
+
+            offsets = array('q', [0])
+            targets = array('i')
+            weights = array('d')
+            for edges in self.engine.adjacency:
+                for v, weight in edges:
+                    targets.append(v)
+                    weights.append(weight)
+                offsets.append(len(targets))
+
+            self.shared = SharedGraph.create(len(self.engine.vertices), offsets, targets, weights)
+
+
+    def close(self):
+        if self.shared is not None:
+            self.shared.close()
+            self.shared.shm.unlink()
+            self.shared = None
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+    def ids(self, vertices):
+        if self.engine is not None:
+            return array('q', [self.engine.vertex_id(v) for v in vertices])
+
+        n = self.shared.n
+        ids = array('q', vertices)
+        for u in ids:
+            if not 0 <= u < n:
+                raise ValueError("vertex %s is not part of this graph" % u)
+        return ids
+
+
+    # Run solve() over all the sources. Yields the result of every task,
+    # in order. workers=1 runs everything in this process.
+    def run(self, sources, targets, workers, out_name):
+        if workers is None:
+            workers = os.cpu_count() or 1
+
+        initargs = (self.shared.shm.name, self.shared.n, self.shared.m, sources, targets, out_name)
+
+        # A few tasks per worker, so that workers that got the easy sources
+        # (small reachable sets) pick up more
+        chunk = max(1, min(64, len(sources) // (4 * workers)))
+        tasks = [(start, min(start + chunk, len(sources))) for start in range(0, len(sources), chunk)]
+
+        if workers == 1 or len(tasks) <= 1:
+            attach(*initargs)
+            try:
+                for task in tasks:
+                    yield solve(task)
+            finally:
+                detach()
+            return
+
+        with Pool(min(workers, len(tasks)), initializer=attach, initargs=initargs) as pool:
+            for rows in pool.imap(solve, tasks):
+                yield rows
+
+
+    # Distance matrix: row i holds the distances from sources[i] to every
+    # vertex (targets=None) or to each of 'targets'. inf if unreachable.
+    #
+    # A numpy array if numpy is installed, a list of array('d') rows if not.
+    def distances(self, sources, targets=None, workers=None):
+        sources = self.ids(sources)
+        if targets is not None:
+            targets = self.ids(targets)
+
+        cols = self.shared.n if targets is None else len(targets)
+        rows = len(sources)
+
+        if rows == 0 or cols == 0:
+            if np is not None:
+                return np.zeros((rows, cols))
+            return [array('d') for _ in range(rows)]
+
+        out = shared_memory.SharedMemory(create=True, size=8 * rows * cols)
+        try:
+            for _ in self.run(sources, targets, workers, out.name):
+                pass
+
+            matrix = out.buf[:8 * rows * cols].cast('d')
+            try:
+                if np is not None:
+                    result = np.frombuffer(matrix, np.float64).reshape(rows, cols).copy()
+                else:
+                    result = [array('d', matrix[i * cols:(i + 1) * cols]) for i in range(rows)]
+            finally:
+                matrix.release()
+        finally:
+            out.close()
+            out.unlink()
+
+        return result
+
+
+    # Like distances(), but yields (source, row) one source at a time (in
+    # order), without holding the whole matrix.
+    def iter_distances(self, sources, targets=None, workers=None):
+        sources = list(sources)
+        ids = self.ids(sources)
+        if targets is not None:
+            targets = self.ids(targets)
+
+        i = 0
+        for rows in self.run(ids, targets, workers, None):
+            for row in rows:
+                yield sources[i], row
+                i += 1
+
+
+
+# One shot version of ParallelDistances(graph).distances(...)
+def distances(graph, sources, targets=None, workers=None):
+    with ParallelDistances(graph) as batch:
+        return batch.distances(sources, targets, workers)
+
+
+
+if __name__ == "__main__":
+    from dijkstra import Vertex
+
+    a, b, c, d = Vertex('A'), Vertex('B'), Vertex('C'), Vertex('D')
+    a.adjacencyList = [(b, 1), (c, 10)]
+    b.adjacencyList = [(c, 2)]
+    c.adjacencyList = [(a, 4)]
+
+    print(distances([a, b, c, d], [a, b, c], workers=2))
+
+    with ParallelDistances([a, b, c, d]) as batch:
+        for source, row in batch.iter_distances([a, b], targets=[c, d], workers=2):
+            print(source.name, list(row))
@@ -0,0 +1,48 @@
+# Scaling of parallel_distances.distances() with the number of workers.
+#
+# Usage: python parallel_distances_benchmark.py [grid side] [sources] [max workers]
+#
+# Runs the same batch of sources on a grid graph (see astar_benchmark.py) with
+# 1, 2, 4, ... workers, checks that all of them return the same matrix, and
+# reports the time and the speedup over 1 worker. The one time copy of the
+# graph into shared memory is reported separately.
+
+
+import os
+import random
+import sys
+import time
+
+from astar_benchmark import grid_graph
+from parallel_distances import ParallelDistances
+
+
+if __name__ == "__main__":
+    side = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 64
+    max_workers = int(sys.argv[3]) if len(sys.argv) > 3 else os.cpu_count() or 1
+
+    rnd = random.Random(1)
+    vertices = grid_graph(side, rnd)
+    sources = rnd.sample(vertices, count)
+
+    start = time.perf_counter()
+    batch = ParallelDistances(vertices)
+    print("%d vertices, %d sources (graph to shared memory: %.2f s)" %
+          (len(vertices), count, time.perf_counter() - start))
+
+    with batch:
+        reference = None
+        workers = 1
+        while workers <= max_workers:
+            start = time.perf_counter()
+            matrix = batch.distances(sources, workers=workers)
+            elapsed = time.perf_counter() - start
+
+            rows = [list(row) for row in matrix]
+            if reference is None:
+                reference = rows, elapsed
+            assert rows == reference[0], "different distances"
+
+            print("workers=%3d  %8.2f s  speedup %5.2f" % (workers, elapsed, reference[1] / elapsed))
+            workers *= 2
@@ -0,0 +1,164 @@
+# Cache of shortest path trees (one per source vertex).
+#
+# Many queries share a source vertex. Instead of running Dijkstra again for
+# every query, keep the per source distance and predecessor arrays of recent
+# sources and answer distance(s, t) / path(s, t) from them.
+#
+# Memory: a tree is two arrays of n entries (8 bytes each). Trees are evicted
+# when their total size goes over 'max_bytes':
+#   policy='lru': evict the least recently used source
+#   policy='lfu': evict the least frequently used source (ties: least
+#                 recently used)
+#
+# Invalidation: the cache remembers the engine version (see DijkstraEngine)
+# its trees were computed at. Change the graph through the engine
+# (cache.engine.add_edge(), update_edge(), remove_edge()) and the next
+# access sees a newer version and drops every cached tree that reaches one
+# of the changed vertices. A change at a vertex that a tree doesn't reach
+# can't change any of its paths (the tree never leaves its reachable set),
+# so those trees are kept. After changing an adjacencyList directly, call
+# invalidate(vertex), which refreshes the engine the same way.
+#
+# hits, misses, evictions and invalidations are counted.
+
+
+from array import array
+from collections import OrderedDict
+
+from dijkstra import DijkstraEngine, ShortestPathTree
+
+
+class ShortestPathCache():
+    def __init__(self, vertexList, max_bytes=64 * 2**20, policy='lru'):
+        if policy not in ('lru', 'lfu'):
+            raise ValueError("policy must be 'lru' or 'lfu'")
+
+        self.engine    = DijkstraEngine(vertexList)
+        self.max_bytes = max_bytes
+        self.policy    = policy
+
+        self.trees = OrderedDict() # source id -> ShortestPathTree, least recently used first
+        self.uses  = {}            # source id -> number of uses (lfu)
+        self.bytes = 0
+
+        self.version = self.engine.version # engine version the trees are up to date with
+
+        self.hits          = 0
+        self.misses        = 0
+        self.evictions     = 0
+        self.invalidations = 0
+
+
+    # The adjacency list of 'vertex' has been changed directly
+    def invalidate(self, vertex):
+        if id(vertex) in self.engine.ids:
+            self.engine.refresh(vertex)
+
+
+    # Drop the trees that changes since the last sync() may have made stale
+    def sync(self):
+        engine = self.engine
+        if engine.version == self.version:
+            return
+
+        changed_ids = [u for u, version in engine.changed_at.items() if version > self.version]
+        self.version = engine.version
+
+        for source, tree in list(self.trees.items()):
+            # Vertices added to the engine after the tree was computed have
+            # no entry in it, and weren't reachable.
+            if any(u < len(tree.dist) and tree.dist[u] != float('inf') for u in changed_ids):
+                self.remove(source)
+                self.invalidations += 1
+
+
+    def tree_bytes(self, tree):
+        return tree.dist.itemsize * len(tree.dist) + tree.prev.itemsize * len(tree.prev)
+
+
+    def remove(self, source):
+        tree = self.trees.pop(source)
+        self.uses.pop(source, None)
+        self.bytes -= self.tree_bytes(tree)
+
+
+    def evict(self):
+        if self.policy == 'lru':
+            source = next(iter(self.trees))
+        else:
+            # Least used, and the least recently used among those (min()
+            # returns the first one, and trees are in LRU order).
+            source = min(self.trees, key=self.uses.__getitem__)
+
+        self.remove(source)
+        self.evictions += 1
+
+
+    # Shortest path tree of 'source', from the cache or freshly computed
+    def tree(self, source):
+        self.sync()
+        s = self.engine.vertex_id(source)
+
+        tree = self.trees.get(s)
+        if tree is not None:
+            self.hits += 1
+            self.trees.move_to_end(s)
+            self.uses[s] += 1
+            return tree
+
+        self.misses += 1
+        result = self.engine.query(source)
+        tree = ShortestPathTree(self.engine, s, array('d', result.dist), array('q', result.prev))
+
+        size = self.tree_bytes(tree)
+        if size > self.max_bytes:
+            # Doesn't fit at all, don't cache it
+            return tree
+
+        while self.trees and self.bytes + size > self.max_bytes:
+            self.evict()
+
+        self.trees[s] = tree
+        self.uses[s] = 1
+        self.bytes += size
+        return tree
+
+
+    def distance(self, source, target):
+        return self.tree(source).distance(target)
+
+
+    def path(self, source, target):
+        return self.tree(source).path(target)
+
+
+    def stats(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'invalidations': self.invalidations,
+            'trees': len(self.trees),
+            'bytes': self.bytes,
+        }
+
+
+
+if __name__ == "__main__":
+    from dijkstra import Vertex
+
+    a, b, c, d = Vertex('A'), Vertex('B'), Vertex('C'), Vertex('D')
+    a.adjacencyList = [(b, 1), (c, 10)]
+    b.adjacencyList = [(c, 2)]
+
+    cache = ShortestPathCache([a, b, c, d])
+    print(cache.distance(a, c), cache.distance(a, c))   # miss, hit
+    print(cache.distance(d, d))                          # miss
+
+    cache.engine.add_edge(b, c, 0.5)                     # drops A's tree, not D's
+    print(cache.distance(a, c), cache.distance(d, d))
+
+    b.adjacencyList.append((d, 1))
+    cache.invalidate(b)                                  # direct change: tell the cache
+    print(cache.distance(a, d))
+    print(cache.stats())
@@ -0,0 +1,50 @@
+# Arity sweep for DaryHeap.
+#
+# Usage: python dary_heap_benchmark.py [number of operations]
+#
+# For each push/pop mix, the heap is first filled with 'n' items and then
+# 'n' random operations are run (push with probability push_ratio, otherwise pop).
+# Reports thousands of operations per second for each arity, so 'arity' can be
+# picked from data for a given workload.
+
+
+import random
+import sys
+import time
+
+from heap import DaryHeap
+
+
+ARITIES = [2, 3, 4, 8, 16]
+PUSH_RATIOS = [0.25, 0.5, 0.75, 0.9]
+
+
+def run(arity, push_ratio, n, seed=1):
+    rnd = random.Random(seed)
+    h = DaryHeap(arity)
+
+    for _ in range(n):
+        h.push(rnd.random())
+
+    ops = [rnd.random() < push_ratio for _ in range(n)]
+    values = [rnd.random() for _ in range(n)]
+
+    start = time.perf_counter()
+    for is_push, value in zip(ops, values):
+        if is_push or not h:
+            h.push(value)
+        else:
+            h.pop()
+    elapsed = time.perf_counter() - start
+
+    return n / elapsed / 1000
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+
+    print("K ops/s (n=%d)" % n)
+    print("push ratio " + "".join("%9s" % ("d=%d" % d) for d in ARITIES))
+    for push_ratio in PUSH_RATIOS:
+        row = [run(d, push_ratio, n) for d in ARITIES]
+        print("%10.2f " % push_ratio + "".join("%9.0f" % r for r in row))
@@ -1,12 +1,55 @@
-class Heap():
+import heapq
+from array import array
+from itertools import islice
+
 
-    HEAP_SIZE = 1000
+class Heap():
 
-    def __init__(self):
-        self.heap = [0] * self.HEAP_SIZE
+    HEAP_SIZE = 1000 # Initial capacity. The heap grows (and shrinks) from here.
+
+    def __init__(self, typecode=None):
+        # typecode = None      : Backed by a python list. Can hold anything that
+        #                        can be compared.
+        # typecode = 'd' or 'q': Backed by a compact array.array of C doubles or
+        #                        C long longs (8 bytes per element). A python list
+        #                        of floats costs a pointer + a boxed float object
+        #                        (~32 bytes) per element. Only for numeric priorities.
+        self.typecode = typecode
+        self.heap = self.allocate(self.HEAP_SIZE)
         self.cur_pos = -1 # no elements in the heap
 
+
+    def allocate(self, size):
+        if self.typecode is None:
+            return [0] * size
+        else:
+            return array(self.typecode, [0]) * size
+
+
+    # Double the capacity when the heap is full.
+    # Doubling (instead of growing by a constant) makes insert amortized O(1)
+    # as far as copying is concerned. extend() can leave the buffer with no
+    # spare room at all (even empty), so never grow by less than HEAP_SIZE.
+    def grow(self):
+        self.heap.extend(self.allocate(max(len(self.heap), self.HEAP_SIZE)))
+
+
+    # Halve the capacity when only a quarter of it is in use.
+    # Shrinking at 1/4 (and not at 1/2) makes sure that alternating
+    # insert/pop at the boundary doesn't keep growing and shrinking the buffer.
+    def shrink(self):
+        if len(self.heap) > self.HEAP_SIZE and (self.cur_pos + 1) <= len(self.heap) // 4:
+            del self.heap[len(self.heap) // 2:]
+
+
+    def __len__(self):
+        return self.cur_pos + 1
+
+
     def insert(self, data, no_heapify=False):
+        if self.cur_pos + 1 == len(self.heap):
+            self.grow()
+
         self.cur_pos += 1
         self.heap[self.cur_pos] = data
 
@@ -35,7 +78,7 @@ class Heap():
 
         # Iterative fixUp
         while index > 0:
-            parent_index = (int)((index - 1) / 2) # Note: This works for both left and right children
+            parent_index = (index - 1) // 2 # Note: This works for both left and right children
 
             if self.heap[parent_index] < self.heap[index]:
                 # swap parent and child
@@ -67,23 +110,34 @@ class Heap():
 
 
         # Iterative fixDown
-        while index <= self.cur_pos:
+        #
+        # Instead of swapping at every level, remember the element we started
+        # with and move the larger child up into the "hole" until the element
+        # fits. No float('-inf') sentinel for missing children, so this also
+        # works for items that can't be compared with floats (e.g. tuples).
+        heap = self.heap
+        last = self.cur_pos
+        item = heap[index]
+
+        while True:
             leftChild  = 2 * index + 1
             rightChild = 2 * index + 2
 
-            val_leftChild = self.heap[leftChild] if leftChild <= self.cur_pos else float('-inf')
-            val_rightChild = self.heap[rightChild] if rightChild <= self.cur_pos else float('-inf')
+            if leftChild > last:
+                break
+
+            largerChild = leftChild
+            if rightChild <= last and heap[leftChild] < heap[rightChild]:
+                largerChild = rightChild
 
-            if self.heap[index] < max(val_leftChild, val_rightChild):
-                if val_leftChild > val_rightChild:
-                    self.heap[index], self.heap[leftChild] = self.heap[leftChild], self.heap[index]
-                    index = leftChild
-                else:
-                    self.heap[index], self.heap[rightChild] = self.heap[rightChild], self.heap[index]
-                    index = rightChild
+            if item < heap[largerChild]:
+                heap[index] = heap[largerChild]
+                index = largerChild
             else:
                 break
 
+        heap[index] = item
+
 
     def heapify(self):
         # Case when no_heapify = True
@@ -109,24 +163,130 @@ class Heap():
 
 
 
-        # Heapify from the end of the array
-        for i in range(self.cur_pos, -1, -1):
-            # 1. Swap 'i' with the largest of its two children
-            # 2. Call fixDown on the largest child
-            leftChild  = 2 * i + 1
-            rightChild = 2 * i + 2
+        # Heapify from the end of the array (Floyd's bottom-up heapify)
+        #
+        # Leaves are already heaps of size 1, so start from the last parent
+        # and fixDown every parent. A fixDown at height h costs O(h) and most
+        # nodes are near the bottom, so the total is O(n) (compared to
+        # O(n log n) for n inserts).
+        for i in range((self.cur_pos - 1) // 2, -1, -1):
+            self.fixDown(i)
+
+
+
+    # Build a heap from any iterable in O(n).
+    # The elements are copied into a single buffer in one go and heapified.
+    @classmethod
+    def from_iterable(cls, iterable, typecode=None):
+        h = cls(typecode)
+        h.extend(iterable)
+        h.heapify()
+        return h
+
+
+    # Append values to the end of the buffer without heapifying.
+    # The spare capacity is dropped first so that the values land right after
+    # the last element.
+    def extend(self, values):
+        del self.heap[self.cur_pos + 1:]
+        self.heap.extend(values)
+        self.cur_pos = len(self.heap) - 1
+
 
-            val_leftChild = self.heap[leftChild] if leftChild <= self.cur_pos else float('-inf')
-            val_rightChild = self.heap[rightChild] if rightChild <= self.cur_pos else float('-inf')
+    # Merge the elements of 'other' into this heap. 'other' is not modified.
+    def merge(self, other):
+        n = len(self)
+        m = len(other)
 
-            if self.heap[i] < max(val_leftChild, val_rightChild):
-                if val_leftChild > val_rightChild:
-                    self.heap[i], self.heap[leftChild] = self.heap[leftChild], self.heap[i]
-                    self.fixDown(leftChild)
-                else:
-                    self.heap[i], self.heap[rightChild] = self.heap[rightChild], self.heap[i]
-                    self.fixDown(rightChild)
+        if m * max(n, 1).bit_length() < n:
+            # Few elements compared to the size of the heap:
+            # m inserts (m log n) are cheaper than a full heapify (n + m)
+            for i in range(m):
+                self.insert(other.heap[i])
+        else:
+            self.extend(other.heap[i] for i in range(m))
+            self.heapify()
+
+
+    # Push 'data' and then pop the max, with at most one fixDown.
+    def pushpop(self, data):
+        if self.cur_pos < 0 or not (data < self.heap[0]):
+            # 'data' would be popped right away
+            return data
+
+        top = self.heap[0]
+        self.heap[0] = data
+        self.fixDown(0)
+        return top
+
+
+    # Pop the max and then push 'data', with one fixDown.
+    # Unlike pushpop, the returned value can be smaller than 'data'.
+    def replace(self, data):
+        if self.cur_pos < 0:
+            raise IndexError("replace on empty heap")
+
+        top = self.heap[0]
+        self.heap[0] = data
+        self.fixDown(0)
+        return top
+
+
+    # The k largest elements (largest first), without modifying the heap.
+    #
+    # The largest element is the root, and the next largest is always a child
+    # of one of the elements already taken. So, keep a small max heap of
+    # "candidate" indices (the children of everything taken so far) and take
+    # from it k times. O(k log k) and it never looks at the rest of the buffer.
+    def nlargest(self, k):
+        result = []
+        if k <= 0 or self.cur_pos < 0:
+            return result
+
+        candidates = DaryHeap(2, key=self.heap.__getitem__, reverse=True)
+        candidates.push(0)
+
+        while candidates and len(result) < k:
+            index = candidates.pop()
+            result.append(self.heap[index])
+
+            for child in (2 * index + 1, 2 * index + 2):
+                if child <= self.cur_pos:
+                    candidates.push(child)
+
+        return result
+
+
+    # The k smallest elements (smallest first), without modifying the heap.
+    #
+    # The max heap order doesn't help here, so scan the buffer once keeping a
+    # bounded heap of size k (heapq.nsmallest). O(n log k), no full sort.
+    def nsmallest(self, k):
+        return heapq.nsmallest(k, islice(self.heap, 0, self.cur_pos + 1))
+
+
+
+    # Remove and return the max element.
+    def pop(self):
+        if self.cur_pos < 0:
+            raise IndexError("pop from empty heap")
+
+        top = self.heap[0]
+
+        # Move the last element to the top and fixDown.
+        # Clear the vacated slot so that a list backed heap doesn't keep
+        # a reference to the popped object alive.
+        last = self.heap[self.cur_pos]
+        self.heap[self.cur_pos] = 0
+        self.cur_pos -= 1
+
+        if self.cur_pos >= 0:
+            self.heap[0] = last
+            self.fixDown(0)
 
+        self.shrink()
+
+        return top
 
 
 
@@ -141,8 +301,148 @@ class Heap():
 
 
 
-h = Heap()
-for i in range(900):
-    h.insert(i, False)
-h.heapsort()
-print(h.heap)
+# d-ary heap.
+#
+# Same idea as the binary heap above, but every node has 'arity' children.
+#   children of i: arity * i + 1 ... arity * i + arity
+#   parent of i  : (i - 1) // arity
+#
+# A larger arity means fewer levels (log_d(n)), so fixUp (push) does fewer
+# comparisons. fixDown (pop) does more comparisons per level (it has to find
+# the best of 'arity' children) but on fewer levels. 4 is usually a good
+# default, but it depends on the push/pop mix (see dary_heap_benchmark.py).
+#
+# Like sorted(), it takes 'key' and 'reverse':
+#   reverse=False: min heap, pop() returns the item with the smallest key
+#   reverse=True : max heap, pop() returns the item with the largest key
+#
+# key(item) is computed exactly once, when the item is pushed, and stored in a
+# list parallel to the items. All comparisons are done on the stored keys, so an
+# item's python level __lt__ is never called.
+#
+# fixUp/fixDown move a "hole" instead of swapping at every level, i.e, one
+# assignment per level instead of three.
+class DaryHeap():
+    def __init__(self, arity=4, key=None, reverse=False):
+        if arity < 2:
+            raise ValueError("arity must be >= 2")
+
+        self.arity   = arity
+        self.key     = key
+        self.reverse = reverse
+
+        self.items = [] # the heap of items
+        self.keys  = [] # keys[i] is key(items[i])
+
+
+    def __len__(self):
+        return len(self.items)
+
+
+    def push(self, item):
+        self.items.append(item)
+        self.keys.append(self.key(item) if self.key else item)
+        self.fixUp(len(self.items) - 1)
+
+
+    def peek(self):
+        if not self.items:
+            raise IndexError("peek from empty heap")
+
+        return self.items[0]
+
+
+    def pop(self):
+        if not self.items:
+            raise IndexError("pop from empty heap")
+
+        last_item = self.items.pop()
+        last_key  = self.keys.pop()
+
+        if not self.items:
+            return last_item
+
+        top = self.items[0]
+        self.items[0] = last_item
+        self.keys[0]  = last_key
+        self.fixDown(0)
+
+        return top
+
+
+    # Pop the top and then push 'item', with one fixDown.
+    def replace(self, item):
+        return self.replace_keyed(item, self.key(item) if self.key else item)
+
+
+    # replace() for an item whose key 'k' the caller already computed
+    # (e.g. to compare it with the top first), so that key() runs only once.
+    def replace_keyed(self, item, k):
+        if not self.items:
+            raise IndexError("replace on empty heap")
+
+        top = self.items[0]
+        self.items[0] = item
+        self.keys[0]  = k
+        self.fixDown(0)
+
+        return top
+
+
+    def fixUp(self, index):
+        items, keys, arity = self.items, self.keys, self.arity
+        item, k = items[index], keys[index]
+
+        # Move the hole up while the parent should be below the new item
+        while index > 0:
+            parent_index = (index - 1) // arity
+            parent_key = keys[parent_index]
+
+            if (k > parent_key) if self.reverse else (k < parent_key):
+                items[index] = items[parent_index]
+                keys[index]  = parent_key
+                index = parent_index
+            else:
+                break
+
+        items[index] = item
+        keys[index]  = k
+
+
+    def fixDown(self, index):
+        items, keys, arity, reverse = self.items, self.keys, self.arity, self.reverse
+        size = len(items)
+        item, k = items[index], keys[index]
+
+        while True:
+            first_child = arity * index + 1
+            if first_child >= size:
+                break
+
+            # Find the best of the (up to) 'arity' children
+            best = first_child
+            best_key = keys[first_child]
+            for child in range(first_child + 1, min(first_child + arity, size)):
+                child_key = keys[child]
+                if (child_key > best_key) if reverse else (child_key < best_key):
+                    best = child
+                    best_key = child_key
+
+            if (best_key > k) if reverse else (best_key < k):
+                items[index] = items[best]
+                keys[index]  = best_key
+                index = best
+            else:
+                break
+
+        items[index] = item
+        keys[index]  = k
+
+
+
+if __name__ == "__main__":
+    h = Heap()
+    for i in range(900):
+        h.insert(i, False)
+    h.heapsort()
+    print(h.heap)
@@ -0,0 +1,59 @@
+# Memory/throughput benchmark for the list backed vs the array backed heap.
+#
+# Usage: python heap_benchmark.py [number of elements]
+#
+# Memory is measured with tracemalloc, so it includes the boxed float objects
+# that a list backed heap points to.
+#   size: bytes held once the heap is built.
+#   peak: highest bytes held while building (includes the temporary copy
+#         made when the buffer doubles).
+
+
+import random
+import sys
+import time
+import tracemalloc
+
+from heap import Heap
+
+
+def build(typecode, data):
+    h = Heap(typecode)
+    for x in data:
+        h.insert(x)
+    return h
+
+
+def drain(h):
+    while len(h):
+        h.pop()
+
+
+def run(n, typecode, data):
+    tracemalloc.start()
+    start = time.perf_counter()
+    h = build(typecode, data)
+    insert_time = time.perf_counter() - start
+    size, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    drain(h)
+    pop_time = time.perf_counter() - start
+
+    print("%-5s n=%-9d size=%7.1f MB (%5.1f bytes/elem)  peak=%7.1f MB  insert=%5.0f K/s  pop=%5.0f K/s" %
+          (typecode or "list", n, size / 2**20, size / n, peak / 2**20,
+           n / insert_time / 1000, n / pop_time / 1000))
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+
+    floats = [random.random() for _ in range(n)]
+    ints = [random.randrange(2**62) for _ in range(n)]
+
+    # Generate the data before tracing starts, but hand over fresh float objects
+    # to the list backed heap so that their cost is accounted for.
+    run(n, None, (float(str(x)) for x in floats))
+    run(n, 'd', floats)
+    run(n, 'q', ints)
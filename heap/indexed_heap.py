@@ -0,0 +1,224 @@
+# Indexed priority queue.
+#
+# A plain heap (heap.py) can't change the priority of an element that is
+# already in the heap because it doesn't know where that element is.
+# An indexed heap additionally keeps a "position map" (key -> index in the heap
+# array) which is updated whenever an element moves. With it, we can find any key in O(1)
+# and then fixUp/fixDown from that index in O(log n).
+#
+# This gives us decrease_key, update and remove, the operations Dijkstra and
+# Prim are usually written with. Each vertex is in the heap at most once, so
+# the heap size is bounded by V (instead of E with the "push duplicates and
+# skip stale entries" approach).
+#
+# PrimEngine (prim_jarnik_MST/prim.py) uses it, through push_or_decrease.
+# The Dijkstra queries (dijkstras_shortest_path/dijkstra.py) stay on heapq
+# with stale entries: heapq is written in C, and a query on a 100k vertex /
+# 500k edge graph takes 1.5 s with it against 2.4 s with this heap.
+#
+# Keys must be hashable. Priorities must be comparable with each other.
+
+
+class IndexedHeap():
+    def __init__(self, min_heap=True):
+        self.min_heap = min_heap # True: pop() returns the min priority
+                                 # False: pop() returns the max priority
+
+        self.keys  = []     # keys[i] is the key stored at heap index i
+        self.prios = []     # prios[i] is the priority of keys[i]
+        self.position = {}  # key -> index into keys/prios
+
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __contains__(self, key):
+        return key in self.position
+
+    def contains(self, key):
+        return key in self.position
+
+
+    # Should the element at index i be above the element at index j ?
+    def before(self, i, j):
+        if self.min_heap:
+            return self.prios[i] < self.prios[j]
+        else:
+            return self.prios[i] > self.prios[j]
+
+
+    def swap(self, i, j):
+        keys  = self.keys
+        prios = self.prios
+
+        keys[i], keys[j] = keys[j], keys[i]
+        prios[i], prios[j] = prios[j], prios[i]
+
+        self.position[keys[i]] = i
+        self.position[keys[j]] = j
+
+
+    # Both fixUp and fixDown move a "hole" instead of swapping: the element
+    # is picked up, the elements on its way are shifted into the hole, and it
+    # is written (and its position updated) once, at its final index.
+    def fixUp(self, index):
+        keys, prios, position = self.keys, self.prios, self.position
+        key, prio = keys[index], prios[index]
+        min_heap = self.min_heap
+
+        while index > 0:
+            parent_index = (index - 1) // 2
+            parent_prio = prios[parent_index]
+
+            if not ((prio < parent_prio) if min_heap else (prio > parent_prio)):
+                break
+
+            keys[index] = keys[parent_index]
+            prios[index] = parent_prio
+            position[keys[index]] = index
+            index = parent_index
+
+        keys[index] = key
+        prios[index] = prio
+        position[key] = index
+
+
+    def fixDown(self, index):
+        keys, prios, position = self.keys, self.prios, self.position
+        key, prio = keys[index], prios[index]
+        min_heap = self.min_heap
+        size = len(keys)
+
+        while True:
+            child = 2 * index + 1
+            if child >= size:
+                break
+
+            # Pick the child that should be higher up in the heap
+            if child + 1 < size:
+                left, right = prios[child], prios[child + 1]
+                if (right < left) if min_heap else (right > left):
+                    child += 1
+
+            child_prio = prios[child]
+            if not ((child_prio < prio) if min_heap else (child_prio > prio)):
+                break
+
+            keys[index] = keys[child]
+            prios[index] = child_prio
+            position[keys[index]] = index
+            index = child
+
+        keys[index] = key
+        prios[index] = prio
+        position[key] = index
+
+
+    def push(self, key, prio):
+        if key in self.position:
+            raise KeyError("key already in heap: %r" % (key,))
+
+        self.keys.append(key)
+        self.prios.append(prio)
+        self.position[key] = len(self.keys) - 1
+        self.fixUp(len(self.keys) - 1)
+
+
+    def peek(self):
+        if not self.keys:
+            raise IndexError("peek from empty heap")
+
+        return self.keys[0], self.prios[0]
+
+
+    def pop(self):
+        if not self.keys:
+            raise IndexError("pop from empty heap")
+
+        return self.remove_at(0)
+
+
+    def priority(self, key):
+        return self.prios[self.position[key]]
+
+
+    # Move 'key' closer to the top of the heap.
+    # i.e, a smaller priority for a min heap, a larger priority for a max heap.
+    def decrease_key(self, key, prio):
+        index = self.position[key]
+
+        if (prio > self.prios[index]) if self.min_heap else (prio < self.prios[index]):
+            raise ValueError("decrease_key would move %r away from the top" % (key,))
+
+        self.prios[index] = prio
+        self.fixUp(index)
+
+
+    # Push 'key', or move it closer to the top if 'prio' is better than its
+    # current priority (the relaxation step of Prim and Dijkstra).
+    # Returns True if 'key' was pushed or moved, False if it was already in the
+    # heap with a priority at least as good.
+    def push_or_decrease(self, key, prio):
+        index = self.position.get(key)
+
+        if index is None:
+            self.push(key, prio)
+            return True
+
+        if not ((prio < self.prios[index]) if self.min_heap else (prio > self.prios[index])):
+            return False
+
+        self.prios[index] = prio
+        self.fixUp(index)
+        return True
+
+
+    # Change the priority of 'key' in either direction.
+    def update(self, key, prio):
+        index = self.position[key]
+        self.prios[index] = prio
+
+        # Only one of these will actually move the element
+        self.fixUp(index)
+        self.fixDown(self.position[key])
+
+
+    # Remove 'key' from the heap and return its priority.
+    def remove(self, key):
+        return self.remove_at(self.position[key])[1]
+
+
+    def remove_at(self, index):
+        last = len(self.keys) - 1
+
+        # Move the element to be removed to the end of the array and then
+        # drop it. The element that took its place may have to go up or down.
+        if index != last:
+            self.swap(index, last)
+
+        key  = self.keys.pop()
+        prio = self.prios.pop()
+        del self.position[key]
+
+        if index != last:
+            moved = self.keys[index]
+            self.fixUp(index)
+            self.fixDown(self.position[moved])
+
+        return key, prio
+
+
+
+if __name__ == "__main__":
+    h = IndexedHeap()
+    h.push('A', 5)
+    h.push('B', 3)
+    h.push('C', 8)
+    h.push('D', 1)
+
+    h.decrease_key('C', 0) # C is now the min
+    h.update('D', 10)      # D moves to the bottom
+    h.remove('B')
+
+    while h:
+        print(h.pop())
@@ -0,0 +1,267 @@
+# Priority scheduler for tasks, built on DaryHeap (heap.py).
+#
+# Three layers:
+# 1. TaskQueue         : The heaps. No locking, no blocking.
+# 2. ThreadScheduler   : TaskQueue + a lock and two conditions (not_empty,
+#                        not_full). get() blocks until a task is ready, put()
+#                        blocks while the scheduler is full (backpressure).
+# 3. AsyncScheduler    : Same as ThreadScheduler, but for asyncio.
+#                        await get(), await put().
+#
+# Ordering:
+# - Lower priority number runs first (same as queue.PriorityQueue).
+# - Tasks with the same priority run in the order they were put (FIFO).
+#   Each task gets a number from a sequence counter and the heap entries are
+#   (priority, seq, item) tuples. seq is unique, so the tuple comparison never
+#   gets as far as comparing the items themselves.
+#
+# Delayed tasks:
+# - put(..., run_at=t) doesn't make the task ready before time t (on the
+#   time.monotonic() clock). Delayed tasks wait in a second heap ordered by
+#   (run_at, seq). Whenever we look for a ready task, every delayed task that
+#   is due is moved into the ready heap (with its original seq), so once it is
+#   due it competes with the other ready tasks by priority.
+# - A blocked get() sleeps until either a new task is put or the earliest
+#   delayed task becomes due, whichever comes first.
+#
+# maxsize counts both ready and delayed tasks. maxsize <= 0 means unbounded.
+
+
+import asyncio
+import threading
+import time
+from collections import deque
+from itertools import count
+from queue import Empty, Full
+
+from heap import DaryHeap
+
+
+class TaskQueue():
+    def __init__(self):
+        self.ready   = DaryHeap(4)  # (priority, seq, item)
+        self.delayed = DaryHeap(4)  # (run_at, seq, priority, item)
+        self.seq     = count()
+
+
+    def __len__(self):
+        return len(self.ready) + len(self.delayed)
+
+
+    def push(self, item, priority=0, run_at=None):
+        seq = next(self.seq)
+
+        if run_at is None:
+            self.ready.push((priority, seq, item))
+        else:
+            self.delayed.push((run_at, seq, priority, item))
+
+
+    # Move every delayed task that is due at 'now' into the ready heap and
+    # return whether there is a ready task.
+    def has_ready(self, now):
+        delayed = self.delayed
+        while delayed and delayed.peek()[0] <= now:
+            run_at, seq, priority, item = delayed.pop()
+            self.ready.push((priority, seq, item))
+
+        return len(self.ready) > 0
+
+
+    # Pop the highest priority ready task. Call has_ready() first.
+    def pop(self):
+        return self.ready.pop()[2]
+
+
+    # Time at which the earliest delayed task becomes due (None if there are
+    # no delayed tasks).
+    def next_due(self):
+        return self.delayed.peek()[0] if self.delayed else None
+
+
+
+class ThreadScheduler():
+    def __init__(self, maxsize=0, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.clock   = clock
+        self.queue   = TaskQueue()
+
+        # Both conditions share one lock, so that a put can wake up a get
+        # (and vice versa) while holding it.
+        self.lock      = threading.Lock()
+        self.not_empty = threading.Condition(self.lock)
+        self.not_full  = threading.Condition(self.lock)
+
+
+    def __len__(self):
+        with self.lock:
+            return len(self.queue)
+
+
+    def put(self, item, priority=0, run_at=None, block=True, timeout=None):
+        with self.not_full:
+            if self.maxsize > 0:
+                deadline = None if timeout is None else self.clock() + timeout
+
+                while len(self.queue) >= self.maxsize:
+                    if not block:
+                        raise Full
+
+                    if deadline is None:
+                        self.not_full.wait()
+                    else:
+                        remaining = deadline - self.clock()
+                        if remaining <= 0:
+                            raise Full
+                        self.not_full.wait(remaining)
+
+            self.queue.push(item, priority, run_at)
+            self.not_empty.notify()
+
+
+    def put_nowait(self, item, priority=0, run_at=None):
+        self.put(item, priority, run_at, block=False)
+
+
+    def get(self, block=True, timeout=None):
+        with self.not_empty:
+            deadline = None if timeout is None else self.clock() + timeout
+
+            while True:
+                now = self.clock()
+
+                if self.queue.has_ready(now):
+                    item = self.queue.pop()
+                    self.not_full.notify()
+                    return item
+
+                if not block:
+                    raise Empty
+
+                # Sleep until the next delayed task is due or the timeout
+                # expires, or until a put() wakes us up.
+                wait = None
+
+                due = self.queue.next_due()
+                if due is not None:
+                    wait = due - now
+
+                if deadline is not None:
+                    remaining = deadline - now
+                    if remaining <= 0:
+                        raise Empty
+                    wait = remaining if wait is None else min(wait, remaining)
+
+                self.not_empty.wait(wait)
+
+
+    def get_nowait(self):
+        return self.get(block=False)
+
+
+
+# Waiting is done the same way asyncio.Queue does it: a blocked get()/put()
+# parks a future in 'getters'/'putters' and the other side wakes up the first
+# one. No locks are needed because nothing can run in between two awaits on
+# the event loop.
+class AsyncScheduler():
+    def __init__(self, maxsize=0, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.clock   = clock
+        self.queue   = TaskQueue()
+
+        self.getters = deque()
+        self.putters = deque()
+
+
+    def __len__(self):
+        return len(self.queue)
+
+
+    def full(self):
+        return self.maxsize > 0 and len(self.queue) >= self.maxsize
+
+
+    def wakeup_next(self, waiters):
+        while waiters:
+            waiter = waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                break
+
+
+    async def put(self, item, priority=0, run_at=None):
+        while self.full():
+            putter = asyncio.get_running_loop().create_future()
+            self.putters.append(putter)
+            try:
+                await putter
+            except asyncio.CancelledError:
+                putter.cancel()
+                if putter in self.putters:
+                    self.putters.remove(putter)
+                elif not self.full():
+                    # We were woken up but won't use the free slot.
+                    # Pass it on to the next putter.
+                    self.wakeup_next(self.putters)
+                raise
+
+        self.put_nowait(item, priority, run_at)
+
+
+    def put_nowait(self, item, priority=0, run_at=None):
+        if self.full():
+            raise asyncio.QueueFull
+
+        self.queue.push(item, priority, run_at)
+        self.wakeup_next(self.getters)
+
+
+    async def get(self):
+        while True:
+            now = self.clock()
+
+            if self.queue.has_ready(now):
+                item = self.queue.pop()
+                self.wakeup_next(self.putters)
+                return item
+
+            # Sleep until a put() wakes us up or the next delayed task is due
+            getter = asyncio.get_running_loop().create_future()
+            self.getters.append(getter)
+
+            due = self.queue.next_due()
+            try:
+                await asyncio.wait([getter], timeout=None if due is None else due - now)
+            except asyncio.CancelledError:
+                if getter.done() and self.queue.has_ready(self.clock()):
+                    # We were woken up for a task that we won't take.
+                    # Pass it on to the next getter.
+                    self.wakeup_next(self.getters)
+                raise
+            finally:
+                getter.cancel()
+                if getter in self.getters:
+                    self.getters.remove(getter)
+
+
+    def get_nowait(self):
+        if not self.queue.has_ready(self.clock()):
+            raise asyncio.QueueEmpty
+
+        item = self.queue.pop()
+        self.wakeup_next(self.putters)
+        return item
+
+
+
+if __name__ == "__main__":
+    s = ThreadScheduler()
+    now = time.monotonic()
+    s.put("low", priority=5)
+    s.put("high", priority=1)
+    s.put("delayed high", priority=0, run_at=now + 0.1)
+    s.put("high (2nd)", priority=1)
+
+    for _ in range(4):
+        print(s.get())
@@ -0,0 +1,121 @@
+# Contention benchmark for the schedulers.
+#
+# Usage: python scheduler_benchmark.py [producers] [consumers] [items per producer]
+#
+# N producer threads put tasks with random priorities, M consumer threads
+# get them until they see a stop sentinel. Reports throughput and the
+# put -> get latency (median and 99th percentile) for:
+#   - ThreadScheduler
+#   - queue.PriorityQueue (the stdlib baseline: heapq + its own lock)
+#   - AsyncScheduler (N producer tasks, M consumer tasks on one event loop)
+
+
+import asyncio
+import queue
+import random
+import sys
+import threading
+import time
+
+from scheduler import AsyncScheduler, ThreadScheduler
+
+
+STOP = float('inf') # priority of the stop sentinels, after every real task
+
+
+def report(name, latencies, elapsed):
+    latencies.sort()
+    n = len(latencies)
+    print("%-20s %8.0f K items/s   p50=%7.1f us   p99=%8.1f us" %
+          (name, n / elapsed / 1000,
+           latencies[n // 2] * 1e6, latencies[min(n - 1, n * 99 // 100)] * 1e6))
+
+
+def run_threads(name, put, get, producers, consumers, items):
+    latencies = []
+
+    def produce(seed):
+        rnd = random.Random(seed)
+        for _ in range(items):
+            put(rnd.randrange(100), time.perf_counter())
+
+    def consume():
+        mine = []
+        while True:
+            priority, created = get()
+            if priority == STOP:
+                break
+            mine.append(time.perf_counter() - created)
+        latencies.extend(mine)
+
+    producer_threads = [threading.Thread(target=produce, args=(i,)) for i in range(producers)]
+    consumer_threads = [threading.Thread(target=consume) for _ in range(consumers)]
+
+    start = time.perf_counter()
+    for t in producer_threads + consumer_threads:
+        t.start()
+    for t in producer_threads:
+        t.join()
+    for _ in range(consumers):
+        put(STOP, 0)
+    for t in consumer_threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    report(name, latencies, elapsed)
+
+
+def thread_scheduler(producers, consumers, items):
+    s = ThreadScheduler(maxsize=1000)
+    run_threads("ThreadScheduler",
+                lambda priority, created: s.put((priority, created), priority),
+                s.get,
+                producers, consumers, items)
+
+
+def stdlib_priority_queue(producers, consumers, items):
+    q = queue.PriorityQueue(maxsize=1000)
+    seq = iter(range(sys.maxsize))
+    run_threads("queue.PriorityQueue",
+                lambda priority, created: q.put((priority, next(seq), (priority, created))),
+                lambda: q.get()[2],
+                producers, consumers, items)
+
+
+async def async_scheduler(producers, consumers, items):
+    s = AsyncScheduler(maxsize=1000)
+    latencies = []
+
+    async def produce(seed):
+        rnd = random.Random(seed)
+        for _ in range(items):
+            priority = rnd.randrange(100)
+            await s.put((priority, time.perf_counter()), priority)
+
+    async def consume():
+        while True:
+            priority, created = await s.get()
+            if priority == STOP:
+                break
+            latencies.append(time.perf_counter() - created)
+
+    start = time.perf_counter()
+    consumer_tasks = [asyncio.create_task(consume()) for _ in range(consumers)]
+    await asyncio.gather(*[produce(i) for i in range(producers)])
+    for _ in range(consumers):
+        await s.put((STOP, 0), STOP)
+    await asyncio.gather(*consumer_tasks)
+    elapsed = time.perf_counter() - start
+
+    report("AsyncScheduler", latencies, elapsed)
+
+
+if __name__ == "__main__":
+    producers = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    consumers = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    items     = int(sys.argv[3]) if len(sys.argv) > 3 else 20000
+
+    print("%d producers, %d consumers, %d items per producer" % (producers, consumers, items))
+    thread_scheduler(producers, consumers, items)
+    stdlib_priority_queue(producers, consumers, items)
+    asyncio.run(async_scheduler(producers, consumers, items))
@@ -0,0 +1,76 @@
+# Regression tests for Heap, IndexedHeap and TopK.
+#
+# Run from this directory: python -m unittest test_heap (or pytest).
+
+
+import unittest
+
+from heap import Heap
+from indexed_heap import IndexedHeap
+from topk import TopK
+
+
+class TestHeapEmptyExtend(unittest.TestCase):
+    # extend() with no values used to leave the buffer with capacity 0, and
+    # the next insert() raised IndexError.
+    def test_insert_after_from_empty_iterable(self):
+        for typecode in (None, 'd'):
+            h = Heap.from_iterable([], typecode)
+            h.insert(1)
+            h.insert(3)
+            self.assertEqual(len(h), 2)
+            self.assertEqual(h.pop(), 3)
+
+    def test_insert_after_merging_empty_heaps(self):
+        h = Heap()
+        h.merge(Heap())
+        h.insert(1)
+        self.assertEqual(h.pop(), 1)
+
+    def test_insert_after_extend_to_full(self):
+        h = Heap.from_iterable(range(5))
+        for value in range(5, 2000):
+            h.insert(value)
+        self.assertEqual([h.pop() for _ in range(3)], [1999, 1998, 1997])
+
+
+class TestIndexedHeapPushOrDecrease(unittest.TestCase):
+    def test_min_heap(self):
+        h = IndexedHeap()
+        self.assertTrue(h.push_or_decrease('A', 5))
+        self.assertTrue(h.push_or_decrease('B', 3))
+        self.assertFalse(h.push_or_decrease('A', 7))
+        self.assertFalse(h.push_or_decrease('A', 5))
+        self.assertTrue(h.push_or_decrease('A', 1))
+        self.assertEqual([h.pop() for _ in range(len(h))], [('A', 1), ('B', 3)])
+
+    def test_max_heap(self):
+        h = IndexedHeap(min_heap=False)
+        h.push('A', 5)
+        h.push('B', 3)
+        self.assertFalse(h.push_or_decrease('A', 1))
+        self.assertTrue(h.push_or_decrease('B', 9))
+        self.assertEqual(h.pop(), ('B', 9))
+
+
+class TestTopKKeyCalls(unittest.TestCase):
+    # push() on a full TopK used to compute key(item) and then have
+    # DaryHeap.replace compute it again.
+    def test_key_computed_once_per_item(self):
+        calls = []
+
+        def key(item):
+            calls.append(item)
+            return -item
+
+        t = TopK(3, key=key)
+        items = [5, 1, 9, 3, 7, 2, 8]
+        for item in items:
+            t.push(item)
+
+        self.assertEqual(len(calls), len(items))
+        self.assertEqual(t.snapshot(), [1, 2, 3])
+
+
+if __name__ == "__main__":
+    unittest.main()
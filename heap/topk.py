@@ -0,0 +1,141 @@
+# Streaming top-k selection.
+#
+# Picks the k largest (or smallest) items out of any iterable in O(k) memory,
+# without materializing the input.
+#
+# To keep the k largest items, we keep a heap of the *opposite* orientation
+# (a min heap) of size k. Its root is the smallest of the k best items seen so
+# far, i.e, the threshold a new item has to beat. A new item that beats the
+# threshold replaces the root (one fixDown). Everything else is dropped after
+# a single comparison. So, a stream of n items costs O(n log k) at worst and
+# close to O(n) once the threshold has settled.
+#
+# NumPy chunks (optional, only if numpy is installed) are first filtered
+# against the threshold with one vectorized comparison, and then cut down to
+# at most k candidates with np.partition. Only those candidates go through
+# the python level heap.
+
+
+from heap import DaryHeap
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class TopK():
+    def __init__(self, k, key=None, largest=True):
+        if k < 0:
+            raise ValueError("k must be >= 0")
+
+        self.k = k
+        self.key = key
+        self.largest = largest
+
+        # Opposite orientation: min heap for the largest items, max heap
+        # for the smallest items.
+        self.heap = DaryHeap(4, key=key, reverse=not largest)
+
+
+    def __len__(self):
+        return len(self.heap)
+
+
+    # The key of the worst item we are currently keeping.
+    # Only meaningful once k items have been seen.
+    def threshold(self):
+        return self.heap.keys[0]
+
+
+    # Does 'k' (a key) beat the current threshold ?
+    def beats(self, k):
+        if self.largest:
+            return k > self.heap.keys[0]
+        else:
+            return k < self.heap.keys[0]
+
+
+    def push(self, item):
+        if len(self.heap) < self.k:
+            self.heap.push(item)
+        elif self.k > 0:
+            k = self.key(item) if self.key else item
+            if self.beats(k):
+                self.heap.replace_keyed(item, k)
+
+
+    # Consume an iterable of items or a numpy array (a chunk of a stream).
+    def feed(self, chunk):
+        if np is not None and isinstance(chunk, np.ndarray):
+            self.feed_array(chunk)
+        else:
+            for item in chunk:
+                self.push(item)
+
+
+    def feed_array(self, chunk):
+        if self.key is not None:
+            raise ValueError("numpy chunks are only supported without a key function")
+
+        chunk = np.asarray(chunk).ravel()
+        k = self.k
+
+        if k == 0 or chunk.size == 0:
+            return
+
+        # Drop everything that can't beat the current threshold
+        if len(self.heap) == k:
+            if self.largest:
+                chunk = chunk[chunk > self.threshold()]
+            else:
+                chunk = chunk[chunk < self.threshold()]
+
+        # At most k of the remaining values can make it into the result
+        if chunk.size > k:
+            if self.largest:
+                chunk = np.partition(chunk, chunk.size - k)[chunk.size - k:]
+            else:
+                chunk = np.partition(chunk, k - 1)[:k]
+
+        for item in chunk.tolist():
+            self.push(item)
+
+
+    # Consume a whole stream of items (or numpy chunks with chunked=True)
+    def consume(self, iterable, chunked=False):
+        if chunked:
+            for chunk in iterable:
+                self.feed(chunk)
+        else:
+            self.feed(iterable)
+
+        return self.snapshot()
+
+
+    # The best items seen so far, best first. Doesn't change the state, so it
+    # can be called in the middle of a stream to read partial results.
+    def snapshot(self):
+        return sorted(self.heap.items, key=self.key, reverse=self.largest)
+
+
+
+# Convenience wrapper
+def topk(iterable, k, key=None, largest=True, chunked=False):
+    return TopK(k, key, largest).consume(iterable, chunked)
+
+
+
+if __name__ == "__main__":
+    import random
+
+    stream = (random.randrange(10**6) for _ in range(10**5))
+    t = TopK(5)
+    for i, x in enumerate(stream):
+        t.push(x)
+        if i == 1000:
+            print("Partial: " + str(t.snapshot()))
+    print("Final:   " + str(t.snapshot()))
+
+    print(topk(["pear", "fig", "banana", "kiwi", "apple"], 2, key=len))
+    print(topk(range(100), 3, largest=False))
@@ -0,0 +1,349 @@
+# Boruvka's MST, with the expensive part spread over a pool of processes.
+#
+# Kruskal and Prim pick one edge at a time, in order, so they can't use more
+# than one core. Boruvka works in rounds instead:
+#
+# 1. For every component (at first, every vertex is its own component),
+#    find the cheapest edge that leaves it.
+# 2. All those edges are in the MST. Add them and merge (contract) the
+#    components they connect.
+# 3. Repeat until no component has an edge leaving it.
+#
+# Every round at least halves the number of components, so there are at
+# most log2(V) rounds. Step 1 is a scan over all the edges where every edge
+# only needs the component labels of its two ends, so the edges are split
+# into ranges and every worker scans one range. The parent combines the
+# per range results (cheapest edge per component) and does step 2 with a
+# DisjointSet (disjoint_set.py).
+#
+# The edge arrays (u, v, weight) and the component label of every vertex live
+# in shared memory: workers attach once, the parent rewrites the labels after
+# every round, and a task is just an edge range.
+#
+# Ties: edges are compared by (weight, edge index). With equal weights, two
+# components could otherwise pick edges that form a cycle. With numpy, that
+# order is computed once up front (the rank of every edge), so the rounds
+# don't sort anything.
+#
+# If the graph isn't connected, the result is a minimum spanning forest.
+
+
+import os
+from array import array
+from multiprocessing import Pool, shared_memory
+
+from disjoint_set import DisjointSet
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# Edge arrays and component labels on top of one shared memory block:
+#   u, v   : m x int64
+#   weight : m x float64
+#   comp   : n x int64 (component label of every vertex)
+# and with numpy:
+#   rank   : m x int64 (position of every edge in (weight, index) order)
+#   order  : m x int64 (edge at every rank)
+# Comparing ranks is the same as comparing (weight, index), and it lets
+# every round find the cheapest edges with np.minimum.at, without sorting.
+class SharedEdges():
+    def __init__(self, shm, n, m):
+        self.shm = shm
+        self.n = n
+        self.m = m
+
+        view = shm.buf
+        self.u      = view[0:8 * m].cast('q')
+        self.v      = view[8 * m:16 * m].cast('q')
+        self.weight = view[16 * m:24 * m].cast('d')
+        self.comp   = view[24 * m:24 * m + 8 * n].cast('q')
+
+        if np is not None:
+            ranks = 24 * m + 8 * n
+            self.rank  = view[ranks:ranks + 8 * m].cast('q')
+            self.order = view[ranks + 8 * m:ranks + 16 * m].cast('q')
+
+
+    @classmethod
+    def size(cls, n, m):
+        return 24 * m + 8 * n + (16 * m if np is not None else 0)
+
+
+    @classmethod
+    def create(cls, n, u, v, weight):
+        m = len(u)
+        shm = shared_memory.SharedMemory(create=True, size=max(cls.size(n, m), 1))
+
+        edges = cls(shm, n, m)
+        if np is not None:
+            # One bulk copy each instead of element by element
+            np.frombuffer(edges.u, dtype=np.int64)[:] = u
+            np.frombuffer(edges.v, dtype=np.int64)[:] = v
+            np.frombuffer(edges.weight, dtype=np.float64)[:] = weight
+            np.frombuffer(edges.comp, dtype=np.int64)[:] = np.arange(n)
+
+            # A stable sort keeps equal weights in index order
+            order = np.frombuffer(edges.order, dtype=np.int64)
+            order[:] = np.argsort(np.frombuffer(edges.weight, dtype=np.float64), kind='stable')
+            np.frombuffer(edges.rank, dtype=np.int64)[order] = np.arange(m)
+        else:
+            edges.u[:] = array('q', u)
+            edges.v[:] = array('q', v)
+            edges.weight[:] = array('d', weight)
+            edges.comp[:] = array('q', range(n))
+        return edges
+
+
+    def close(self):
+        views = [self.u, self.v, self.weight, self.comp]
+        if np is not None:
+            views += [self.rank, self.order]
+        for view in views:
+            view.release()
+        self.shm.close()
+
+
+
+# State of a worker process, set up once by attach()
+worker = {}
+
+
+def attach(name, n, m):
+    worker['edges'] = SharedEdges(shared_memory.SharedMemory(name), n, m)
+
+
+def detach():
+    worker.pop('edges').close()
+
+
+# Step 1 for the edges start ... end-1.
+# Returns (components, edges): the cheapest edge leaving each component that
+# has an edge leaving it in this range. With numpy, edges are given by their
+# rank instead of their index.
+def cheapest_edges(task):
+    start, end = task
+    edges = worker['edges']
+
+    if np is not None:
+        return cheapest_edges_numpy(edges, start, end)
+
+    u, v, weight, comp = edges.u, edges.v, edges.weight, edges.comp
+    best = {} # component -> (weight, edge index)
+
+    for i in range(start, end):
+        cu = comp[u[i]]
+        cv = comp[v[i]]
+        if cu == cv:
+            continue
+
+        key = (weight[i], i)
+        if cu not in best or key < best[cu]:
+            best[cu] = key
+        if cv not in best or key < best[cv]:
+            best[cv] = key
+
+    return array('q', best.keys()), array('q', [i for w, i in best.values()])
+
+
+# Same as cheapest_edges, with numpy: np.minimum.at keeps the smallest rank
+# per component.
+def cheapest_edges_numpy(edges, start, end):
+    comp = np.frombuffer(edges.comp, dtype=np.int64)
+    cu = comp[np.frombuffer(edges.u, dtype=np.int64)[start:end]]
+    cv = comp[np.frombuffer(edges.v, dtype=np.int64)[start:end]]
+    rank = np.frombuffer(edges.rank, dtype=np.int64)[start:end]
+
+    leaving = cu != cv
+    rank = rank[leaving]
+
+    best = np.full(edges.n, edges.m)
+    np.minimum.at(best, cu[leaving], rank)
+    np.minimum.at(best, cv[leaving], rank)
+
+    components = np.flatnonzero(best < edges.m)
+    return array('q', components.tobytes()), array('q', best[components].tobytes())
+
+
+
+class Boruvka():
+    # 'n' vertices 0 ... n-1, edge i is u[i] - v[i] with weight[i]
+    # (any sequences of numbers, e.g. lists, array.array or numpy arrays).
+    def __init__(self, n, u, v, weight):
+        if not len(u) == len(v) == len(weight):
+            raise ValueError("u, v and weight must have the same length")
+
+        for x in (u, v):
+            if np is not None:
+                x = np.asarray(x)
+                low, high = (x.min(), x.max()) if len(x) else (0, -1)
+            else:
+                low, high = (min(x), max(x)) if len(x) else (0, -1)
+
+            if low < 0 or high >= n:
+                raise ValueError("edge with a vertex outside 0 ... %d" % (n - 1))
+
+        self.edges = SharedEdges.create(n, u, v, weight)
+        self.rounds = 0
+
+
+    def close(self):
+        if self.edges is not None:
+            self.edges.close()
+            self.edges.shm.unlink()
+            self.edges = None
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+    # Returns (mst, total weight), mst as a list of (u, v, weight).
+    # workers=None uses all cores, workers=1 runs in this process.
+    def MST(self, workers=None):
+        edges = self.edges
+        n, m = edges.n, edges.m
+
+        if workers is None:
+            workers = os.cpu_count() or 1
+
+        # A few ranges per worker, so that a worker that is done early
+        # picks up more
+        chunk = max(1, -(-m // (4 * workers)))
+        tasks = [(start, min(start + chunk, m)) for start in range(0, m, chunk)]
+
+        if np is not None:
+            np.frombuffer(edges.comp, dtype=np.int64)[:] = np.arange(n)
+        else:
+            for label in range(n):
+                edges.comp[label] = label
+
+        sets = DisjointSet(n)
+        mst = []
+        total = 0
+        self.rounds = 0
+
+        pool = None
+        if workers > 1 and len(tasks) > 1:
+            pool = Pool(min(workers, len(tasks)), initializer=attach, initargs=(edges.shm.name, n, m))
+            scan = pool.imap_unordered
+        else:
+            attach(edges.shm.name, n, m)
+            scan = map
+
+        try:
+            while True:
+                # Step 1: combine the cheapest edges of all the ranges
+                picked = self.combine(scan(cheapest_edges, tasks))
+                if not len(picked):
+                    break
+                self.rounds += 1
+
+                # Step 2
+                total += self.contract(sets, picked, mst)
+                self.relabel(sets)
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+            else:
+                detach()
+
+        return mst, total
+
+
+    # Cheapest edge of every component, from the (components, edges) results
+    # of all the ranges. Returns the edge indices (a numpy array with numpy).
+    def combine(self, results):
+        edges = self.edges
+
+        if np is not None:
+            # Smallest rank per component over all the ranges
+            best = np.full(edges.n, edges.m)
+            for components, ranks in results:
+                np.minimum.at(best, np.frombuffer(components, dtype=np.int64),
+                              np.frombuffer(ranks, dtype=np.int64))
+
+            return np.frombuffer(edges.order, dtype=np.int64)[best[best < edges.m]]
+
+        weight = edges.weight
+        best = {} # component -> (weight, edge index)
+        for components, indices in results:
+            for c, i in zip(components, indices):
+                key = (weight[i], i)
+                if c not in best or key < best[c]:
+                    best[c] = key
+
+        return [i for w, i in best.values()]
+
+
+    # Add the picked edges to 'mst' and merge their components.
+    # Returns their total weight.
+    #
+    # With the (weight, index) order, the picked edges form a forest, except
+    # that two components can pick the same edge. So with numpy, the distinct
+    # picked edges all go into the MST and the merging is one bulk
+    # DisjointSet.union_many. Without numpy, the second union of a shared
+    # edge just does nothing.
+    def contract(self, sets, picked, mst):
+        edges = self.edges
+
+        if np is not None:
+            picked = np.unique(picked)
+            u = np.frombuffer(edges.u, dtype=np.int64)[picked]
+            v = np.frombuffer(edges.v, dtype=np.int64)[picked]
+            weight = np.frombuffer(edges.weight, dtype=np.float64)[picked]
+
+            sets.union_many(u, v)
+            mst.extend(zip(u.tolist(), v.tolist(), weight.tolist()))
+            return weight.sum().item()
+
+        total = 0
+        for i in picked:
+            u, v, weight = edges.u[i], edges.v[i], edges.weight[i]
+            if sets.union(u, v):
+                mst.append((u, v, weight))
+                total += weight
+        return total
+
+
+    # Component label of every vertex = its DisjointSet root
+    def relabel(self, sets):
+        comp = self.edges.comp
+
+        if np is not None:
+            # Pointer jumping flattens the DisjointSet trees in place
+            parent = np.frombuffer(sets.parent, dtype=np.int64)
+            while True:
+                grandparent = parent[parent]
+                if np.array_equal(grandparent, parent):
+                    break
+                parent[:] = grandparent
+            np.frombuffer(comp, dtype=np.int64)[:] = parent
+            return
+
+        for x in range(len(comp)):
+            comp[x] = sets.find(x)
+
+
+
+# One shot version of Boruvka(n, u, v, weight).MST(workers)
+def boruvka_mst(n, u, v, weight, workers=None):
+    with Boruvka(n, u, v, weight) as boruvka:
+        return boruvka.MST(workers)
+
+
+
+if __name__ == "__main__":
+    # A-B 1, B-C 2, A-C 1.5, C-D 3, B-D 11
+    u      = [0, 1, 0, 2, 1]
+    v      = [1, 2, 2, 3, 3]
+    weight = [1, 2, 1.5, 3, 11]
+
+    print(boruvka_mst(4, u, v, weight, workers=2))
@@ -0,0 +1,57 @@
+# Scaling of the parallel Boruvka MST with the number of workers.
+#
+# Usage: python boruvka_benchmark.py [vertices] [edges] [max workers]
+#
+# Random graph with random weights. Runs Boruvka with 1, 2, 4, ... workers,
+# checks that the total weight is the same as Kruskal's (sorted edges +
+# DisjointSet, like kruskal_csr) and reports the time, the speedup over 1
+# worker and the number of rounds.
+
+
+import os
+import random
+import sys
+import time
+
+from boruvka import Boruvka
+from disjoint_set import DisjointSet
+
+
+def kruskal_total(n, u, v, weight):
+    sets = DisjointSet(n)
+    total = 0
+    for i in sorted(range(len(u)), key=weight.__getitem__):
+        if sets.union(u[i], v[i]):
+            total += weight[i]
+    return total
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    m = int(sys.argv[2]) if len(sys.argv) > 2 else 1000000
+    max_workers = int(sys.argv[3]) if len(sys.argv) > 3 else os.cpu_count() or 1
+
+    rnd = random.Random(1)
+    u = [rnd.randrange(n) for _ in range(m)]
+    v = [rnd.randrange(n) for _ in range(m)]
+    weight = [rnd.random() for _ in range(m)]
+
+    start = time.perf_counter()
+    expected = kruskal_total(n, u, v, weight)
+    print("%d vertices, %d edges (kruskal: %.2f s)" % (n, m, time.perf_counter() - start))
+
+    with Boruvka(n, u, v, weight) as boruvka:
+        reference = None
+        workers = 1
+        while workers <= max_workers:
+            start = time.perf_counter()
+            mst, total = boruvka.MST(workers)
+            elapsed = time.perf_counter() - start
+
+            assert abs(total - expected) < 1e-6, "different total weight than Kruskal"
+            if reference is None:
+                reference = elapsed
+
+            print("workers=%3d  %8.2f s  speedup %5.2f  rounds %d" %
+                  (workers, elapsed, reference / elapsed, boruvka.rounds))
+            workers *= 2
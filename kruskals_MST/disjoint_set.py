@@ -0,0 +1,209 @@
+# Union-find (disjoint sets) on integer arrays.
+#
+# The union-find inside Kruskal (kruskal.py) is a Node object per vertex and
+# a recursive "find": every element is a full python object and a long parent
+# chain can hit the recursion limit.
+#
+# Here elements are the ids 0 ... n-1 and the whole structure is two flat
+# arrays:
+#   parent[x]: parent of x in its tree, parent[x] == x for the root
+#              (the set representative)
+#   size[x]  : number of elements in the set, only meaningful for roots
+#
+# The two usual optimizations:
+# 1. union by size: the root of the smaller set goes under the root of the
+#    bigger one, so trees stay O(log n) deep.
+# 2. path halving: "find" is a loop that points every node on the way up to
+#    its grandparent. Same effect as path compression, no recursion and a
+#    single pass.
+#
+# Arbitrary hashable items can be used through add()/id_of(), which give
+# every item an id.
+
+
+from array import array
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class DisjointSet():
+    def __init__(self, n=0):
+        self.parent = array('q', range(n))
+        self.size   = array('q', [1]) * n
+        self.count  = n  # number of disjoint sets
+
+        self.ids   = {}  # item -> id, for items added with add()
+        self.items = []  # id -> item (None for ids that were never add()'ed)
+
+
+    def __len__(self):
+        return len(self.parent)
+
+
+    # New element in a set of its own. Returns its id.
+    # With an item, the item can later be turned into its id with id_of().
+    def add(self, item=None):
+        if item is not None and item in self.ids:
+            return self.ids[item]
+
+        x = len(self.parent)
+        self.parent.append(x)
+        self.size.append(1)
+        self.count += 1
+
+        if item is not None:
+            self.items.extend([None] * (x - len(self.items)))
+            self.items.append(item)
+            self.ids[item] = x
+
+        return x
+
+
+    def id_of(self, item):
+        return self.ids[item]
+
+
+    def item(self, x):
+        return self.items[x] if x < len(self.items) else None
+
+
+    # Set representative of x
+    def find(self, x):
+        parent = self.parent
+
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+
+        return x
+
+
+    # Merge the sets of x and y.
+    # Returns False if they were already in the same set.
+    def union(self, x, y):
+        x = self.find(x)
+        y = self.find(y)
+
+        if x == y:
+            return False
+
+        if self.size[x] < self.size[y]:
+            x, y = y, x
+
+        self.parent[y] = x
+        self.size[x] += self.size[y]
+        self.count -= 1
+        return True
+
+
+    def connected(self, x, y):
+        return self.find(x) == self.find(y)
+
+
+    # Number of elements in the set of x
+    def component_size(self, x):
+        return self.size[self.find(x)]
+
+
+    # union(xs[i], ys[i]) for all i. Returns the number of merges.
+    #
+    # xs and ys can be any iterables of ids. With numpy arrays, the whole batch
+    # is done with array operations instead of a python loop (see
+    # union_arrays()).
+    def union_many(self, xs, ys):
+        if np is not None and isinstance(xs, np.ndarray) and isinstance(ys, np.ndarray):
+            return self.union_arrays(xs, ys)
+
+        parent, size = self.parent, self.size
+        merged = 0
+
+        for x, y in zip(xs, ys):
+            while parent[x] != x:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            while parent[y] != y:
+                parent[y] = parent[parent[y]]
+                y = parent[y]
+
+            if x == y:
+                continue
+
+            if size[x] < size[y]:
+                x, y = y, x
+
+            parent[y] = x
+            size[x] += size[y]
+            merged += 1
+
+        self.count -= merged
+        return merged
+
+
+    # Bulk union with numpy, working on the parent array in place.
+    #
+    # Rounds of:
+    # 1. Pointer jumping (parent = parent[parent]) until every element points
+    #    straight at its root.
+    # 2. For every pair whose roots differ, hook the larger root under the
+    #    smaller one. When several pairs hook the same root, the smallest
+    #    target wins (np.minimum.at), the others are retried next round.
+    # Roots only ever point to smaller ids, so no cycles. Ends when all pairs
+    # have the same root. Few rounds in practice, each O(n + len(xs)).
+    #
+    # Union by size doesn't apply here. The trees end up completely flat
+    # anyway, and the sizes are recounted at the end.
+    def union_arrays(self, xs, ys):
+        xs = np.asarray(xs, dtype=np.int64).ravel()
+        ys = np.asarray(ys, dtype=np.int64).ravel()
+        if len(xs) != len(ys):
+            raise ValueError("xs and ys must have the same length")
+
+        n = len(self.parent)
+        if len(xs) and (min(xs.min(), ys.min()) < 0 or max(xs.max(), ys.max()) >= n):
+            raise IndexError("element id out of range")
+
+        parent = np.frombuffer(self.parent, dtype=np.int64)  # view, no copy
+        ids = np.arange(n)
+        before = self.count
+
+        while True:
+            while True:
+                grandparent = parent[parent]
+                if np.array_equal(grandparent, parent):
+                    break
+                parent[:] = grandparent
+
+            rx = parent[xs]
+            ry = parent[ys]
+            differ = rx != ry
+            if not differ.any():
+                break
+
+            rx = rx[differ]
+            ry = ry[differ]
+            np.minimum.at(parent, np.maximum(rx, ry), np.minimum(rx, ry))
+
+            xs = xs[differ]
+            ys = ys[differ]
+
+        roots = parent == ids
+        self.count = int(roots.sum())
+        np.frombuffer(self.size, dtype=np.int64)[:] = np.where(roots, np.bincount(parent, minlength=n), 1)
+
+        return before - self.count
+
+
+
+if __name__ == "__main__":
+    ds = DisjointSet(5)
+    ds.union(0, 1)
+    ds.union(3, 4)
+    print(ds.connected(0, 1), ds.connected(1, 3), ds.component_size(4), ds.count)
+
+    cities = DisjointSet()
+    for a, b in [("Paris", "Lyon"), ("Lyon", "Nice"), ("Rome", "Milan")]:
+        cities.union(cities.add(a), cities.add(b))
+    print(cities.connected(cities.id_of("Paris"), cities.id_of("Nice")), cities.count)
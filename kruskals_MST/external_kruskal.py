@@ -0,0 +1,174 @@
+# Kruskal for edge lists that don't fit in memory.
+#
+# Kruskal.MST() sorts the whole list of Edge objects in memory. Kruskal only
+# needs the edges in order of weight, one after the other, so an external
+# sort works just as well:
+#
+# 1. Read the edge list in chunks of 'chunk_size' edges. Sort every chunk
+#    and write it to a temporary file (a "sorted run") as fixed size binary
+#    records (weight, u, v).
+# 2. Merge the runs with heapq.merge (k-way merge, one record per run in
+#    memory at a time). If there are more than 'fan_in' runs, merge groups of
+#    them into bigger runs first, so that we never have too many files open.
+# 3. Feed the merged stream into a DisjointSet (disjoint_set.py) exactly like
+#    Kruskal.MST(), and stop as soon as V - 1 edges are picked: the heaviest
+#    edges usually never have to be read back at all.
+#
+# Memory: the vertex name -> id map, the DisjointSet (O(V)) and one chunk of
+# edges (O(chunk_size)), never the whole edge list.
+#
+# The input is a text edge list, one edge per line: "u v [weight]" separated
+# by whitespace or commas (weight 1 if missing), '#' starts a comment line.
+# Lines are parsed with parse_line() from csr_graph/graph_file.py. The graph is
+# undirected.
+
+
+import os
+import struct
+import tempfile
+from heapq import merge
+
+if __name__ == "__main__":
+    # parse_line is in ../csr_graph/graph_file.py. Scripts that import this
+    # module put that directory on sys.path themselves.
+    import sys
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'csr_graph'))
+
+from disjoint_set import DisjointSet
+from graph_file import parse_line
+
+
+RECORD = struct.Struct('<dqq') # weight, u, v
+READ_RECORDS = 8192            # records per read() when reading a run back
+
+
+# Sort 'records' and write them to a new file in 'directory'
+def write_run(records, directory):
+    records.sort()
+
+    fd, path = tempfile.mkstemp(suffix='.run', dir=directory)
+    with os.fdopen(fd, 'wb') as f:
+        write_records(f, records)
+
+    return path
+
+
+def write_records(f, records):
+    pack = RECORD.pack
+    f.write(b''.join([pack(*record) for record in records]))
+
+
+def read_run(path):
+    with open(path, 'rb') as f:
+        while True:
+            data = f.read(READ_RECORDS * RECORD.size)
+            if not data:
+                break
+            yield from RECORD.iter_unpack(data)
+
+
+# Merge runs, 'fan_in' at a time, until there are at most 'fan_in' left
+def reduce_runs(paths, directory, fan_in):
+    while len(paths) > fan_in:
+        merged = []
+
+        for i in range(0, len(paths), fan_in):
+            group = paths[i:i + fan_in]
+            if len(group) == 1:
+                merged.append(group[0])
+                continue
+
+            fd, path = tempfile.mkstemp(suffix='.run', dir=directory)
+            with os.fdopen(fd, 'wb') as f:
+                block = []
+                for record in merge(*[read_run(p) for p in group]):
+                    block.append(record)
+                    if len(block) == READ_RECORDS:
+                        write_records(f, block)
+                        block = []
+                write_records(f, block)
+
+            for p in group:
+                os.remove(p)
+            merged.append(path)
+
+        paths = merged
+
+    return paths
+
+
+# Minimum spanning tree of the edge list in the file at 'path'.
+#
+# Returns (edges, total weight), edges as (u name, v name, weight) in the
+# order they were picked. Fewer than V - 1 edges means the graph is
+# disconnected (a minimum spanning forest).
+#
+# Temporary files go to 'tmp_dir' (the system default if None) and are
+# removed at the end.
+def kruskal_external(path, chunk_size=1000000, tmp_dir=None, fan_in=64, encoding='utf-8'):
+    if chunk_size < 1 or fan_in < 2:
+        raise ValueError("chunk_size must be >= 1 and fan_in >= 2")
+
+    sets = DisjointSet()
+
+    with tempfile.TemporaryDirectory(dir=tmp_dir) as directory:
+        # Step 1: sorted runs
+        runs = []
+        chunk = []
+
+        with open(path, encoding=encoding) as f:
+            for line in f:
+                edge = parse_line(line)
+                if edge is None:
+                    continue
+
+                u = sets.add(edge[0])
+                v = sets.add(edge[1])
+                chunk.append((edge[2], u, v))
+
+                if len(chunk) == chunk_size:
+                    runs.append(write_run(chunk, directory))
+                    chunk = []
+
+        if chunk:
+            runs.append(write_run(chunk, directory))
+        del chunk
+
+        # Step 2
+        runs = reduce_runs(runs, directory, fan_in)
+        readers = [read_run(p) for p in runs]
+
+        # Step 3
+        n = len(sets)
+        mst = []
+        total = 0
+
+        try:
+            for weight, u, v in merge(*readers):
+                if not sets.union(u, v):
+                    # Adding this edge would introduce a cycle
+                    continue
+
+                mst.append((sets.item(u), sets.item(v), weight))
+                total += weight
+
+                if len(mst) == n - 1:
+                    break
+        finally:
+            for reader in readers:
+                reader.close()
+
+    return mst, total
+
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as tmp:
+        src = os.path.join(tmp, "edges.csv")
+
+        with open(src, "w") as f:
+            f.write("# from,to,weight\nA,B,1\nB,C,2\nA,C,1.5\nC,D,3\nB,D,11\n")
+
+        # Tiny chunks and fan in, to go through every step
+        edges, total = kruskal_external(src, chunk_size=2, fan_in=2)
+        print(edges, total)
@@ -0,0 +1,284 @@
+# Minimum spanning forest of a graph that keeps getting new edges.
+#
+# Running Kruskal again after every batch of new edges costs O(E log E) each
+# time. But a new edge u-v changes the MST by at most one edge:
+#   - u and v are in different trees: the edge joins them, it is in the MST.
+#   - u and v are in the same tree: the edge closes a cycle with the tree
+#     path u ... v. If the heaviest edge on that path is heavier than the new
+#     edge, swap them. Otherwise the MST stays the same.
+#
+# So all we need is a forest that supports "connected", "heaviest edge on the
+# path u ... v", "link" and "cut". A link-cut tree does all of them in
+# O(log V) amortized.
+#
+# Link-cut tree, in short: the forest is split into paths, each path is kept
+# in a splay tree ordered by depth. access(x) rearranges the paths so that
+# the path from the root to x is one splay tree, and make_root(x) reverses
+# that path (lazily, with a 'reversed' flag) so that x becomes the root. Every
+# splay tree node knows the heaviest node in its subtree, so the heaviest
+# node on a path is read at the root of its splay tree.
+#
+# Edge weights are stored on nodes: every MST edge u-v is an extra node 'e'
+# linked as u - e - v, vertex nodes have weight -inf. The heaviest node on the
+# path u ... v is then the heaviest edge.
+#
+# All nodes are indices into flat lists (left child, right child, parent, ...)
+# instead of objects. Nodes of edges that leave the MST are reused.
+
+
+from array import array
+
+
+class IncrementalMST():
+    # 'n' vertices 0 ... n-1. 'edges' are (u, v, weight) to start with, e.g.
+    # the result of kruskal_csr (or any edges at all, they are added one by
+    # one).
+    def __init__(self, n=0, edges=()):
+        self.left   = []
+        self.right  = []
+        self.parent = []
+        self.flip   = []  # children of this node still have to be swapped
+        self.weight = []
+        self.top    = []  # heaviest node in the splay subtree of this node
+
+        self.vertex_node = array('q') # vertex -> its node
+        self.edges = {}               # node of an MST edge -> (u, v, weight)
+        self.free  = []               # nodes of removed edges, for reuse
+        self.total = 0
+
+        for u in range(n):
+            self.add_vertex()
+
+        self.add_edges(edges)
+
+
+    def __len__(self):
+        return len(self.vertex_node)
+
+
+    def new_node(self, weight):
+        if self.free:
+            x = self.free.pop()
+            self.left[x] = self.right[x] = self.parent[x] = -1
+            self.flip[x] = False
+            self.weight[x] = weight
+            self.top[x] = x
+            return x
+
+        x = len(self.weight)
+        self.left.append(-1)
+        self.right.append(-1)
+        self.parent.append(-1)
+        self.flip.append(False)
+        self.weight.append(weight)
+        self.top.append(x)
+        return x
+
+
+    # New vertex (the next id) in a tree of its own. Returns its id.
+    def add_vertex(self):
+        self.vertex_node.append(self.new_node(float('-inf')))
+        return len(self.vertex_node) - 1
+
+
+    def node_of(self, u):
+        if not 0 <= u < len(self.vertex_node):
+            raise ValueError("vertex %s is not part of this graph" % u)
+        return self.vertex_node[u]
+
+
+    # ----- Splay trees -----
+
+    # x is the root of its splay tree (its parent is in another path, or
+    # it has no parent at all)
+    def is_root(self, x):
+        p = self.parent[x]
+        return p == -1 or (self.left[p] != x and self.right[p] != x)
+
+
+    # Apply a pending reversal of x to its children
+    def push(self, x):
+        if self.flip[x]:
+            l, r = self.left[x], self.right[x]
+            self.left[x], self.right[x] = r, l
+            if l != -1:
+                self.flip[l] = not self.flip[l]
+            if r != -1:
+                self.flip[r] = not self.flip[r]
+            self.flip[x] = False
+
+
+    # Recompute top[x] from its children
+    def pull(self, x):
+        weight, top = self.weight, self.top
+        best = x
+        l, r = self.left[x], self.right[x]
+        if l != -1 and weight[top[l]] > weight[best]:
+            best = top[l]
+        if r != -1 and weight[top[r]] > weight[best]:
+            best = top[r]
+        top[x] = best
+
+
+    def rotate(self, x):
+        left, right, parent = self.left, self.right, self.parent
+        p = parent[x]
+        g = parent[p]
+
+        if not self.is_root(p):
+            if left[g] == p:
+                left[g] = x
+            else:
+                right[g] = x
+        parent[x] = g
+
+        if left[p] == x:
+            left[p] = right[x]
+            if right[x] != -1:
+                parent[right[x]] = p
+            right[x] = p
+        else:
+            right[p] = left[x]
+            if left[x] != -1:
+                parent[left[x]] = p
+            left[x] = p
+        parent[p] = x
+
+        self.pull(p)
+        self.pull(x)
+
+
+    # Bring x to the root of its splay tree
+    def splay(self, x):
+        # Pending reversals from the root down to x first
+        path = [x]
+        while not self.is_root(path[-1]):
+            path.append(self.parent[path[-1]])
+        for y in reversed(path):
+            self.push(y)
+
+        parent = self.parent
+        while not self.is_root(x):
+            p = parent[x]
+            if not self.is_root(p):
+                g = parent[p]
+                if (self.left[g] == p) == (self.left[p] == x):
+                    self.rotate(p) # zig-zig
+                else:
+                    self.rotate(x) # zig-zag
+            self.rotate(x)
+
+
+    # ----- Link-cut tree -----
+
+    # Make the path from the root of x's tree to x one splay tree, with x
+    # at its root
+    def access(self, x):
+        last = -1
+        y = x
+        while y != -1:
+            self.splay(y)
+            self.right[y] = last
+            self.pull(y)
+            last = y
+            y = self.parent[y]
+        self.splay(x)
+
+
+    def make_root(self, x):
+        self.access(x)
+        self.flip[x] = not self.flip[x]
+
+
+    def find_root(self, x):
+        self.access(x)
+        self.push(x)
+        while self.left[x] != -1:
+            x = self.left[x]
+            self.push(x)
+        self.splay(x)
+        return x
+
+
+    def link(self, x, y):
+        self.make_root(x)
+        self.parent[x] = y
+
+
+    def cut(self, x, y):
+        self.make_root(x)
+        self.access(y)
+        # x is now the left child of y, with nothing in between
+        self.left[y] = -1
+        self.parent[x] = -1
+        self.pull(y)
+
+
+    # Heaviest node on the path x ... y (same tree)
+    def path_max(self, x, y):
+        self.make_root(x)
+        self.access(y)
+        return self.top[y]
+
+
+    # ----- MST -----
+
+    def connected(self, u, v):
+        return self.find_root(self.node_of(u)) == self.find_root(self.node_of(v))
+
+
+    # Add edge u-v. Returns True if it went into the MST.
+    def add_edge(self, u, v, weight):
+        x, y = self.node_of(u), self.node_of(v)
+        if x == y:
+            return False
+
+        if self.find_root(x) == self.find_root(y):
+            e = self.path_max(x, y)
+            if self.weight[e] <= weight:
+                # Heaviest edge on the cycle: not in the MST
+                return False
+
+            # Swap the heaviest edge on the cycle out
+            a, b, old = self.edges.pop(e)
+            self.cut(self.vertex_node[a], e)
+            self.cut(e, self.vertex_node[b])
+            self.free.append(e)
+            self.total -= old
+
+        e = self.new_node(weight)
+        self.link(x, e)
+        self.link(e, y)
+        self.edges[e] = (u, v, weight)
+        self.total += weight
+        return True
+
+
+    # Add a batch of (u, v, weight) edges. Returns how many went into the MST
+    # (some of them may have been swapped out again by later ones).
+    def add_edges(self, edges):
+        return sum(1 for u, v, weight in edges if self.add_edge(u, v, weight))
+
+
+    def total_weight(self):
+        return self.total
+
+
+    # Current MST (forest) edges as (u, v, weight)
+    def mst_edges(self):
+        return list(self.edges.values())
+
+
+
+if __name__ == "__main__":
+    # A-B 1, B-C 2, A-C 1.5, C-D 3
+    mst = IncrementalMST(4, [(0, 1, 1), (1, 2, 2), (0, 2, 1.5), (2, 3, 3)])
+    print(mst.mst_edges(), mst.total_weight())
+
+    mst.add_edge(1, 3, 0.5)  # replaces C-D (the heaviest edge on B-A-C-D)
+    print(mst.mst_edges(), mst.total_weight())
+
+    e = mst.add_vertex()
+    print(mst.connected(0, e))
+    mst.add_edge(e, 3, 7)
+    print(mst.connected(0, e), mst.total_weight())
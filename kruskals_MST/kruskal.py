@@ -9,6 +9,14 @@
 # Notice the use of "is" comparison instead of "==" in implementation of union-find.
 
 
+from disjoint_set import DisjointSet
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
 # Vertices of the graph
 class Vertex():
     def __init__(self, name):
@@ -135,16 +143,120 @@ class Kruskal():
             
 
 
-v1 = Vertex("A")
-v2 = Vertex("B")
-v3 = Vertex("C")
-v4 = Vertex("D")
 
-e1 = Edge(v1, v2, 1)
-e2 = Edge(v2, v3, 2)
-e3 = Edge(v1, v3, 1.5)
-e4 = Edge(v3, v4, 3)
-e5 = Edge(v2, v4, 11)
+# Kruskal over an undirected CSR graph (see csr_graph/csr_graph.py).
+#
+# 'graph' is anything with n, offsets, targets and weights, with every edge
+# stored in both directions. Each edge is looked at once (u < v).
+#
+# The union-find here is a DisjointSet (disjoint_set.py): arrays indexed by
+# vertex id instead of Node objects, and an iterative "find" so there is no
+# recursion.
+#
+# Returns the list of picked (u, v, weight) edges. Fewer than n - 1 edges
+# means the graph is disconnected (a minimum spanning forest).
+def kruskal_csr(graph):
+    offsets, targets, weights = graph.offsets, graph.targets, graph.weights
+
+    edges = []
+    for u in range(graph.n):
+        for i in range(offsets[u], offsets[u + 1]):
+            if u < targets[i]:
+                edges.append((weights[i], u, targets[i]))
+    edges.sort()
+
+    sets = DisjointSet(graph.n)
+
+    mst = []
+    for weight, u, v in edges:
+        if not sets.union(u, v):
+            continue
+
+        mst.append((u, v, weight))
+        if len(mst) == graph.n - 1:
+            break
+
+    return mst
+
+
+
+# Kruskal over edges that are already in numpy arrays: edge i is u[i] - v[i]
+# with weight w[i], vertices are 0 ... n-1.
+#
+# No Edge objects: the edges are ordered with one stable np.argsort of w
+# (equal weights keep their input order) and the union-find is two python
+# lists, inlined in the loop (same as DisjointSet: union by size, path
+# halving). The loop stops at n - 1 picked edges, and the sorted edges are
+# converted to python ints one block at a time so that the edges after that
+# point are never touched.
+#
+# Returns a boolean numpy array: mask[i] is True if edge i is in the MST
+# (a minimum spanning forest if the graph isn't connected).
+def kruskal_arrays(n, u, v, w):
+    if np is None:
+        raise ImportError("kruskal_arrays needs numpy")
+
+    u = np.asarray(u)
+    v = np.asarray(v)
+    w = np.asarray(w)
+    if not u.shape == v.shape == w.shape or u.ndim != 1:
+        raise ValueError("u, v and w must be 1-d arrays of the same length")
+
+    mask = np.zeros(len(w), dtype=bool)
+    if len(w) == 0 or n < 2:
+        return mask
+    if min(u.min(), v.min()) < 0 or max(u.max(), v.max()) >= n:
+        raise ValueError("edge with a vertex outside 0 ... %d" % (n - 1))
+
+    order = np.argsort(w, kind='stable')
+
+    parent = list(range(n))
+    size   = [1] * n
+    picked = []
+    block  = 65536
+
+    for start in range(0, len(order), block):
+        index = order[start:start + block]
+
+        for i, x, y in zip(index.tolist(), u[index].tolist(), v[index].tolist()):
+            while parent[x] != x:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            while parent[y] != y:
+                parent[y] = parent[parent[y]]
+                y = parent[y]
+
+            if x == y:
+                # Adding this edge would introduce a cycle
+                continue
+
+            if size[x] < size[y]:
+                x, y = y, x
+            parent[y] = x
+            size[x] += size[y]
+
+            picked.append(i)
+            if len(picked) == n - 1:
+                break
+        else:
+            continue
+        break
+
+    mask[picked] = True
+    return mask
+
+
+if __name__ == "__main__":
+    v1 = Vertex("A")
+    v2 = Vertex("B")
+    v3 = Vertex("C")
+    v4 = Vertex("D")
+
+    e1 = Edge(v1, v2, 1)
+    e2 = Edge(v2, v3, 2)
+    e3 = Edge(v1, v3, 1.5)
+    e4 = Edge(v3, v4, 3)
+    e5 = Edge(v2, v4, 11)
 
 
-k = Kruskal([v1,v2,v3,v4], [e1,e2,e3,e4,e5])
+    k = Kruskal([v1,v2,v3,v4], [e1,e2,e3,e4,e5])
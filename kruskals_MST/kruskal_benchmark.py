@@ -0,0 +1,50 @@
+# Kruskal on Edge objects (Kruskal.MST) vs on numpy arrays (kruskal_arrays).
+#
+# Usage: python kruskal_benchmark.py [vertices] [edges]
+#
+# Random graph with random weights. Building the Edge objects is reported
+# separately (kruskal_arrays never needs them). Checks that both find the
+# same total weight.
+
+
+import contextlib
+import io
+import sys
+import time
+
+import numpy as np
+
+from kruskal import Edge, Kruskal, Vertex, kruskal_arrays
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    m = int(sys.argv[2]) if len(sys.argv) > 2 else 1000000
+
+    rnd = np.random.default_rng(1)
+    u = rnd.integers(0, n, m)
+    v = rnd.integers(0, n, m)
+    w = rnd.random(m)
+    print("%d vertices, %d edges" % (n, m))
+
+    start = time.perf_counter()
+    mask = kruskal_arrays(n, u, v, w)
+    arrays_time = time.perf_counter() - start
+    print("kruskal_arrays     %8.2f s" % arrays_time)
+
+    start = time.perf_counter()
+    vertices = [Vertex(str(i)) for i in range(n)]
+    edges = [Edge(vertices[a], vertices[b], c) for a, b, c in zip(u.tolist(), v.tolist(), w.tolist())]
+    print("Edge objects build %8.2f s" % (time.perf_counter() - start))
+
+    # Kruskal prints one line per edge it looks at, in sorted order
+    output = io.StringIO()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(output):
+        Kruskal(vertices, edges)
+    objects_time = time.perf_counter() - start
+    print("Kruskal.MST        %8.2f s  (%.1fx slower)" % (objects_time, objects_time / arrays_time))
+
+    lines = output.getvalue().splitlines()
+    total = sum(e.weight for e, line in zip(sorted(edges), lines) if line.startswith("Picking"))
+    assert abs(total - w[mask].sum()) < 1e-6, "different total weights"
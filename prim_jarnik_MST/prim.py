@@ -5,6 +5,23 @@
 
 
 import heapq
+import math
+from array import array
+
+if __name__ == "__main__":
+    # PrimEngine needs IndexedHeap from ../heap. Scripts that import this
+    # module put that directory on sys.path themselves (see
+    # prim_dense_benchmark.py).
+    import os
+    import sys
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'heap'))
+
+from indexed_heap import IndexedHeap
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 class Vertex():
     def __init__(self, name):
@@ -65,6 +82,7 @@ class Prim():
         # This implementation assumes that the given graph is connected.
         # If it is a disconnected graph, then this implementation won't work
         # because we will be looping forever.
+        # (PrimEngine below handles disconnected graphs.)
         while self.unvisitedVertices:
 
             # We have to pick min edge such that one vertex is in MST and the
@@ -99,20 +117,247 @@ class Prim():
 
 
 
-v1 = Vertex("A")
-v2 = Vertex("B")
-v3 = Vertex("C")
-v4 = Vertex("D")
+# Prim-Jarnik in O(E log V), for large graphs.
+#
+# Prim.MST() above keeps the unvisited vertices in a list ('in' is O(V)) and
+# pushes every edge into the heap, so it is quadratic on big graphs. And it
+# only works for connected graphs.
+#
+# Here vertices are numbered 0 ... n-1 once, a bytearray marks the vertices in
+# the tree and an IndexedHeap (heap/indexed_heap.py) holds, for every vertex
+# next to the tree, the weight of the lightest edge that connects it to the
+# tree. Every vertex is in the heap at most once, so the heap never holds more
+# than n entries, unlike the heap of edges in Prim.MST() which grows with the
+# number of edges.
+#
+# If the graph isn't connected, Prim starts again from the next vertex that
+# isn't in any tree yet, so the result is a minimum spanning forest (one tree
+# per connected component).
+class PrimEngine():
+    def __init__(self, vertexList):
+        self.vertices = []
+        self.ids = {} # id(Vertex) -> vertex id
+
+        for vertex in vertexList:
+            if id(vertex) not in self.ids:
+                self.ids[id(vertex)] = len(self.vertices)
+                self.vertices.append(vertex)
+
+        # adjacency[u]: list of (other vertex id, weight, Edge)
+        self.adjacency = []
+        for vertex in self.vertices:
+            edges = []
+            for edge in vertex.edgeList or ():
+                otherVertex = edge.endVertex if edge.startVertex is vertex else edge.startVertex
+                if id(otherVertex) not in self.ids:
+                    raise ValueError("edge %s-%s has a vertex that is not in vertexList" %
+                                     (edge.startVertex.name, edge.endVertex.name))
+                edges.append((self.ids[id(otherVertex)], edge.weight, edge))
+            self.adjacency.append(edges)
+
+
+    # Minimum spanning tree (or forest, if the graph isn't connected).
+    # The first tree starts at 'startVertex' (any vertex if None).
+    #
+    # Returns (edges, total weight). edges are the Edge objects of the
+    # tree(s), in the order in which Prim picked them.
+    # self.trees is the number of trees (connected components).
+    def MST(self, startVertex=None):
+        n = len(self.vertices)
+        adjacency = self.adjacency
+
+        inMST    = bytearray(n)
+        bestEdge = [None] * n # lightest edge from the tree to each vertex in the heap
+        heap     = IndexedHeap()
+
+        edges = []
+        total = 0
+        self.trees = 0
+
+        roots = range(n)
+        if startVertex is not None:
+            start = self.ids[id(startVertex)]
+            roots = [start] + [u for u in range(n) if u != start]
+
+        for root in roots:
+            if inMST[root]:
+                continue
+
+            self.trees += 1
+            heap.push(root, 0)
+
+            while heap:
+                u = heap.pop()[0]
+                inMST[u] = 1
+
+                if bestEdge[u] is not None:
+                    edges.append(bestEdge[u])
+                    total += bestEdge[u].weight
+
+                for v, weight, edge in adjacency[u]:
+                    if not inMST[v] and heap.push_or_decrease(v, weight):
+                        bestEdge[v] = edge
+
+        return edges, total
+
+
+
+# Prim over an undirected CSR graph (see csr_graph/csr_graph.py).
+#
+# 'graph' is anything with n, offsets, targets and weights, with every edge
+# stored in both directions. 'start' is a vertex id.
+#
+# Same algorithm as Prim.MST() above, with vertex ids instead of objects:
+# the heap holds (weight, vertex, parent) tuples and a bytearray marks the
+# vertices that are already in the MST.
+#
+# Returns (parent, weight) arrays indexed by vertex id. parent[v] is the
+# other end of the MST edge that brought v into the tree and weight[v] is its
+# weight. The start vertex and vertices that can't be reached from it have
+# parent -1.
+def prim_csr(graph, start=0):
+    offsets, targets, weights = graph.offsets, graph.targets, graph.weights
+
+    parent = array('q', [-1]) * graph.n
+    weight = array('d', [0.0]) * graph.n
+    inMST  = bytearray(graph.n)
+
+    heap = [(0, start, -1)]
+
+    while heap:
+        w, v, u = heapq.heappop(heap)
+
+        if inMST[v]:
+            # Skip edge with both vertices already in MST.
+            continue
+
+        inMST[v]  = 1
+        parent[v] = u
+        weight[v] = w
+
+        for i in range(offsets[v], offsets[v + 1]):
+            otherVertex = targets[i]
+            if not inMST[otherVertex]:
+                heapq.heappush(heap, (weights[i], otherVertex, v))
+
+    return parent, weight
+
+
+
+# Prim for dense graphs (complete or nearly complete, e.g. a distance matrix
+# for clustering), with numpy. O(V^2) time, O(V) extra memory.
+#
+# With E ~ V^2 edges, a heap of edges costs O(V^2 log V) and one python object
+# per edge. Instead, keep an array 'best' with the lightest edge from the tree
+# to every vertex outside of it. Each step:
+#   1. u = argmin(best) joins the tree.
+#   2. best = minimum(best, distances from u) (only for vertices outside the
+#      tree), remembering u as the parent where that got better.
+# Both are single numpy operations over n entries.
+#
+# 'distances' is either
+#   a symmetric n x n matrix (distances[u][v] = weight of edge u-v), or
+#   a condensed distance vector of length n(n-1)/2: the upper triangle row by
+#   row, as returned by scipy.spatial.distance.pdist.
+# inf means "no edge". The diagonal is ignored.
+#
+# Returns (parent, weight) numpy arrays, like prim_csr. If the graph isn't
+# connected, every component gets its own tree (minimum spanning forest), and
+# the first vertex of each extra component is a root (parent -1) as well.
+def prim_dense(distances, start=0):
+    if np is None:
+        raise ImportError("prim_dense needs numpy")
+
+    distances = np.asarray(distances, dtype=np.float64)
+
+    if distances.ndim == 2:
+        n = distances.shape[0]
+        if distances.shape != (n, n):
+            raise ValueError("distance matrix must be square, got shape %s" % (distances.shape,))
+
+        def row(u):
+            return distances[u]
+
+    elif distances.ndim == 1:
+        n = int(round((1 + math.sqrt(1 + 8 * len(distances))) / 2))
+        if n * (n - 1) // 2 != len(distances):
+            raise ValueError("condensed distance vector of length %d doesn't match any n" % len(distances))
+
+        # Distance u-v (u < v) is at rowStart[u] + v - u - 1
+        ids = np.arange(n)
+        rowStart = n * ids - ids * (ids + 1) // 2
+
+        def row(u):
+            r = np.empty(n)
+            r[:u] = distances[rowStart[:u] + (u - ids[:u] - 1)]
+            r[u] = np.inf
+            r[u + 1:] = distances[rowStart[u]:rowStart[u] + n - u - 1]
+            return r
+
+    else:
+        raise ValueError("expected a distance matrix or a condensed distance vector")
+
+    parent = np.full(n, -1, dtype=np.int64)
+    weight = np.zeros(n)
+    if n == 0:
+        return parent, weight
+
+    if not 0 <= start < n:
+        raise ValueError("start vertex %d is not part of this graph" % start)
+
+    inMST    = np.zeros(n, dtype=bool)
+    best     = np.full(n, np.inf) # lightest edge from the tree to each vertex (inf for tree vertices)
+    bestFrom = np.full(n, -1, dtype=np.int64)
+    best[start] = 0
+
+    for _ in range(n):
+        u = int(np.argmin(best))
+
+        if best[u] == np.inf:
+            # Nothing left that is connected to this tree: start a new one
+            u = int(np.flatnonzero(~inMST)[0])
+        else:
+            parent[u] = bestFrom[u]
+            weight[u] = best[u] if bestFrom[u] != -1 else 0
+
+        inMST[u] = True
+        best[u] = np.inf
+
+        r = row(u)
+        closer = r < best
+        closer &= ~inMST
+        np.minimum(best, r, out=best, where=closer)
+        bestFrom[closer] = u
+
+    return parent, weight
+
+
+if __name__ == "__main__":
+    v1 = Vertex("A")
+    v2 = Vertex("B")
+    v3 = Vertex("C")
+    v4 = Vertex("D")
+
+    e1 = Edge(v1, v2, 1)
+    e2 = Edge(v2, v3, 2)
+    e3 = Edge(v1, v3, 1.5)
+    e4 = Edge(v3, v4, 3)
+    e5 = Edge(v2, v4, 11)
+
+    v1.edgeList = [e1, e3]
+    v2.edgeList = [e1, e2, e5]
+    v3.edgeList = [e2, e3, e4]
+    v4.edgeList = [e4, e5]
 
-e1 = Edge(v1, v2, 1)
-e2 = Edge(v2, v3, 2)
-e3 = Edge(v1, v3, 1.5)
-e4 = Edge(v3, v4, 3)
-e5 = Edge(v2, v4, 11)
+    p = Prim([v1,v2,v3,v4], v1)
 
-v1.edgeList = [e1, e3]
-v2.edgeList = [e1, e2, e5]
-v3.edgeList = [e2, e3, e4]
-v4.edgeList = [e4, e5]
+    print()
+    v5 = Vertex("E")
+    v6 = Vertex("F")
+    e6 = Edge(v5, v6, 4)
+    v5.edgeList = [e6]
+    v6.edgeList = [e6]
 
-p = Prim([v1,v2,v3,v4], v1)
+    engine = PrimEngine([v1,v2,v3,v4,v5,v6])
+    edges, total = engine.MST(v1)
+    print([(e.startVertex.name, e.endVertex.name, e.weight) for e in edges], total, engine.trees)
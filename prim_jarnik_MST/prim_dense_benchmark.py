@@ -0,0 +1,66 @@
+# Dense (numpy, O(V^2)) vs sparse (heap, O(E log V)) Prim.
+#
+# Usage: python prim_dense_benchmark.py [vertices]
+#
+# For a fixed number of vertices and a growing edge density (fraction of all
+# vertex pairs that have an edge), runs prim_dense on the distance matrix
+# (inf = no edge) and PrimEngine.MST on the same graph as Edge objects, checks
+# that they find the same total weight and reports both times. The dense
+# version doesn't care about the density, the heap version gets slower with
+# every edge, so the crossover is the density where the two columns meet.
+# Building the Edge objects isn't timed (it only makes the heap version
+# look worse).
+
+
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'heap'))
+
+from prim import Edge, PrimEngine, Vertex, prim_dense
+
+
+def random_graph(n, density, rnd):
+    matrix = np.full((n, n), np.inf)
+    vertices = [Vertex(str(i)) for i in range(n)]
+    for vertex in vertices:
+        vertex.edgeList = []
+
+    for u in range(n):
+        for v in range(u + 1, n):
+            if rnd.random() < density:
+                weight = rnd.random()
+                matrix[u, v] = matrix[v, u] = weight
+                edge = Edge(vertices[u], vertices[v], weight)
+                vertices[u].edgeList.append(edge)
+                vertices[v].edgeList.append(edge)
+
+    return matrix, vertices
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    rnd = random.Random(1)
+
+    print("%d vertices" % n)
+    print("%8s %10s %10s %10s" % ("density", "edges", "dense s", "heap s"))
+
+    for density in (0.001, 0.005, 0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1.0):
+        matrix, vertices = random_graph(n, density, rnd)
+        edges = sum(len(v.edgeList) for v in vertices) // 2
+
+        start = time.perf_counter()
+        parent, weight = prim_dense(matrix)
+        dense_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        mst, total = PrimEngine(vertices).MST()
+        heap_time = time.perf_counter() - start
+
+        assert abs(weight.sum() - total) < 1e-6, "different total weights"
+
+        print("%8.3f %10d %10.3f %10.3f" % (density, edges, dense_time, heap_time))